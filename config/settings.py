@@ -2,32 +2,66 @@
 Configuration settings for ecommerce_scrapers project.
 Loads environment variables from a .env file via python-dotenv.
 Expose a single `settings` object for the rest of the codebase to import.
+
+The resolved settings are snapshotted to ~/.cache/ecom-scrapper/settings.pkl and
+reused on later imports while the .env file (mtime + size) and the relevant process
+environment variables are unchanged, so .env is only parsed when it changes.
+
+Actor IDs are not part of the snapshot: `settings.actor_for(name)` reads
+`<NAME>_ACTOR` from the environment on first use and memoizes it, so only the
+actors a run actually touches are looked up.
 """
 
 from __future__ import annotations
 
 
 import os
+import pickle
+import sys
+from functools import lru_cache
 from pathlib import Path
-from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from dataclasses import asdict, dataclass, fields
+from types import MappingProxyType
+from typing import Optional, Dict, Any, Mapping, Tuple
+
+
+from dotenv import find_dotenv, load_dotenv
 
 
-from dotenv import load_dotenv
+# Environment variables that feed into Settings (part of the snapshot fingerprint).
+_ENV_KEYS = (
+    "APIFY_API_KEY",
+    "APIFY_TOKEN",
+    "DEFAULT_MEMORY_MBYTES",
+    "DEFAULT_WAIT_FOR_FINISH",
+    "DEFAULT_WAIT_FOR_FINISH_TIMEOUT",
+    "LOGS_DIR",
+    "DATA_DIR",
+    "REQUEST_RETRY_TOTAL",
+    "REQUEST_RETRY_BACKOFF_FACTOR",
+    "APIFY_RATE_LIMIT_RPS",
+    "APIFY_POLL_INTERVAL_MAX",
+    "SCRAPE_CACHE_TTL",
+)
 
+_CACHE_PATH = Path.home() / ".cache" / "ecom-scrapper" / "settings.pkl"
 
-# Load .env from project root (caller should ensure working dir is project root)
-load_dotenv()
+# Actor IDs resolved so far, keyed by actor name (e.g. "amazon" -> AMAZON_ACTOR)
+_ACTOR_IDS: Dict[str, Optional[str]] = {}
 
+# .env path located at import; loaded into os.environ on first need (see _ensure_dotenv)
+_DOTENV_PATH: str = ""
+_DOTENV_LOADED = False
 
-@dataclass(frozen=True)
+# Fixed slot layout instead of a per-instance __dict__ where dataclasses support it (3.10+)
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class Settings:
     # Core
     APIFY_API_KEY: str
 
-    # Actor IDs (defaults read from env)
-    ACTORS: Dict[str, Any]
-
     # Runtime defaults for running actors
     DEFAULT_MEMORY_MBYTES: int = 1024
     DEFAULT_WAIT_FOR_FINISH: bool = True
@@ -40,10 +74,26 @@ class Settings:
     # Network / retry
     REQUEST_RETRY_TOTAL: int = 3
     REQUEST_RETRY_BACKOFF_FACTOR: float = 0.5
+    # Apify API calls per second per actor key (Apify throttles at ~30/s)
+    APIFY_RATE_LIMIT_RPS: float = 25.0
+    # Longest single waitForFinish request while polling a run (Apify caps it at 60s)
+    APIFY_POLL_INTERVAL_MAX: int = 60
+    # Seconds a cached actor run (same actor + input) is reused; 0 disables the cache
+    SCRAPE_CACHE_TTL: int = 86400
+
+    @property
+    def ACTORS(self) -> Mapping[str, Optional[str]]:
+        """Read-only view of the actor IDs resolved so far via actor_for()."""
+        return MappingProxyType(_ACTOR_IDS)
+
+    def actor_for(self, name: str) -> Optional[str]:
+        """Return the actor ID configured as <NAME>_ACTOR, or None if unset."""
+        return _actor_id(name)
 
 
 def _load_settings_from_env() -> Settings:
-    apify_key = os.getenv("APIFY_API_KEY") or os.getenv("APIFY_TOKEN")
+    env = os.environ.copy()
+    apify_key = env.get("APIFY_API_KEY") or env.get("APIFY_TOKEN")
     if not apify_key:
         raise RuntimeError(
             "APIFY_API_KEY not found in environment. Please add it to your .env or env vars."
@@ -51,31 +101,95 @@ def _load_settings_from_env() -> Settings:
 
     return Settings(
         APIFY_API_KEY=apify_key,
-        ACTORS={
-            "amazon": os.getenv("AMAZON_ACTOR"),
-            "ebay": os.getenv("EBAY_ACTOR"),
-            "etsy": os.getenv("ETSY_ACTOR"),
-            "alibaba": os.getenv("ALIBABA_ACTOR"),
-            "walmart": os.getenv("WALMART_ACTOR"),
-            "jumia": os.getenv("JUMIA_ACTOR"),
-        },
-        DEFAULT_MEMORY_MBYTES=int(os.getenv("DEFAULT_MEMORY_MBYTES", "1024")),
+        DEFAULT_MEMORY_MBYTES=int(env.get("DEFAULT_MEMORY_MBYTES", "1024")),
         DEFAULT_WAIT_FOR_FINISH=(
-            os.getenv("DEFAULT_WAIT_FOR_FINISH", "true").lower() in ("1", "true", "yes")
+            env.get("DEFAULT_WAIT_FOR_FINISH", "true").lower() in ("1", "true", "yes")
         ),
         DEFAULT_WAIT_FOR_FINISH_TIMEOUT=int(
-            os.getenv("DEFAULT_WAIT_FOR_FINISH_TIMEOUT", "600")
+            env.get("DEFAULT_WAIT_FOR_FINISH_TIMEOUT", "600")
         ),
-        LOGS_DIR=os.getenv("LOGS_DIR", "logs"),
-        DATA_DIR=os.getenv("DATA_DIR", "data"),
-        REQUEST_RETRY_TOTAL=int(os.getenv("REQUEST_RETRY_TOTAL", "3")),
+        LOGS_DIR=env.get("LOGS_DIR", "logs"),
+        DATA_DIR=env.get("DATA_DIR", "data"),
+        REQUEST_RETRY_TOTAL=int(env.get("REQUEST_RETRY_TOTAL", "3")),
         REQUEST_RETRY_BACKOFF_FACTOR=float(
-            os.getenv("REQUEST_RETRY_BACKOFF_FACTOR", "0.5")
+            env.get("REQUEST_RETRY_BACKOFF_FACTOR", "0.5")
         ),
+        APIFY_RATE_LIMIT_RPS=float(env.get("APIFY_RATE_LIMIT_RPS", "25")),
+        APIFY_POLL_INTERVAL_MAX=int(env.get("APIFY_POLL_INTERVAL_MAX", "60")),
+        SCRAPE_CACHE_TTL=int(env.get("SCRAPE_CACHE_TTL", "86400")),
     )
 
 
+def _ensure_dotenv() -> None:
+    """Load .env into os.environ once; skipped at import when the snapshot is used."""
+    global _DOTENV_LOADED
+    if not _DOTENV_LOADED:
+        load_dotenv(_DOTENV_PATH)
+        _DOTENV_LOADED = True
+
+
+@lru_cache(maxsize=None)
+def _actor_id(name: str) -> Optional[str]:
+    _ensure_dotenv()
+    actor_id = os.getenv(f"{name.upper()}_ACTOR")
+    _ACTOR_IDS[name] = actor_id
+    return actor_id
+
+
+def _fingerprint(dotenv_path: str) -> Tuple[Any, ...]:
+    """Identify the inputs a Settings snapshot was built from."""
+    try:
+        st = os.stat(dotenv_path) if dotenv_path else None
+    except OSError:
+        st = None
+    return (
+        dotenv_path,
+        (st.st_mtime_ns, st.st_size) if st else None,
+        tuple(os.environ.get(k) for k in _ENV_KEYS),
+        tuple(f.name for f in fields(Settings)),
+    )
+
+
+def _load_cached_settings(fingerprint: Tuple[Any, ...]) -> Optional[Settings]:
+    try:
+        with _CACHE_PATH.open("rb") as fh:
+            cached_fingerprint, values = pickle.load(fh)
+        if cached_fingerprint != fingerprint:
+            return None
+        return Settings(**values)
+    except Exception:
+        # Missing, unreadable or outdated snapshot -> rebuild from the environment
+        return None
+
+
+def _save_cached_settings(fingerprint: Tuple[Any, ...], value: Settings) -> None:
+    try:
+        _CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = _CACHE_PATH.with_suffix(".tmp")
+        # The snapshot holds the API key, so keep it private to the current user
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump((fingerprint, asdict(value)), fh)
+        os.replace(tmp_path, _CACHE_PATH)
+    except OSError:
+        # Caching is best-effort; settings still work without it
+        pass
+
+
+def _load_settings() -> Settings:
+    global _DOTENV_PATH
+    # Locate .env from project root (caller should ensure working dir is project root)
+    _DOTENV_PATH = dotenv_path = find_dotenv()
+    fingerprint = _fingerprint(dotenv_path)
+    cached = _load_cached_settings(fingerprint)
+    if cached is not None:
+        return cached
+
+    _ensure_dotenv()
+    value = _load_settings_from_env()
+    _save_cached_settings(fingerprint, value)
+    return value
+
+
 # Singleton settings object importable across the codebase
-settings = _load_settings_from_env()
-Path(settings.DATA_DIR).mkdir(parents=True, exist_ok=True)
-Path(settings.LOGS_DIR).mkdir(parents=True, exist_ok=True)
+settings = _load_settings()
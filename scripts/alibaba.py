@@ -19,20 +19,35 @@ Usage (CLI):
 """
 from __future__ import annotations
 
-import argparse
-import json
-from datetime import datetime, timezone
+import time
 from pathlib import Path
-from typing import Iterable, List, Optional, Dict
+from typing import TYPE_CHECKING, Iterable, List, Optional, Dict, Sequence
 from urllib.parse import urlencode, quote_plus
 
 from config.settings import settings
+from utils.cli import (
+    build_common_argparser,
+    categories_from_args,
+    normalize_categories,
+)
 from utils.logger import get_logger
-from utils.apify_client import run_actor_and_save
+
+if TYPE_CHECKING:
+    import argparse
 
 logger = get_logger("alibaba")
 
 
+# Static search parameters shared by every Alibaba search URL.
+_ALIBABA_SEARCH_PARAMS: Dict[str, str] = {"fsb": "y", "IndexArea": "product_en"}
+
+# Entries starting with one of these are passed through as start URLs.
+_URL_SCHEMES = ("http://", "https://")
+
+# Apify proxy groups used when the caller doesn't pass any.
+_DEFAULT_PROXY_GROUPS = ("RESIDENTIAL",)
+
+
 def _build_alibaba_search_url(
     query: str,
 ) -> str:
@@ -41,29 +56,9 @@ def _build_alibaba_search_url(
     Uses common query parameters seen on Alibaba search pages.
     """
     base = "https://www.alibaba.com/trade/search"
-    # core params
-    params: Dict[str, str] = {
-        "fsb": "y",
-        "IndexArea": "product_en",
-        "SearchText": query.strip(),
-        "keywords": query.strip(),
-    }
-
-    # urlencode will percent-encode keywords correctly; but keep it readable by using quote for keywords
-    # ensure keywords are properly encoded
-    # build query string manually so keywords are quoted
-    qs_items = []
-    for k, v in params.items():
-        if k == "keywords":
-            qs_items.append(f"{k}={quote_plus(v)}")
-        else:
-            qs_items.append(f"{k}={quote_plus(str(v))}")
-    qs = "&".join(qs_items)
-    return f"{base}?{qs}"
-
-
-def _normalize_categories(categories: Iterable[str]) -> List[str]:
-    return [str(c).strip() for c in categories if c and str(c).strip()]
+    q = query.strip()
+    params = {**_ALIBABA_SEARCH_PARAMS, "SearchText": q, "keywords": q}
+    return f"{base}?{urlencode(params, quote_via=quote_plus)}"
 
 
 def _categories_to_start_urls(
@@ -74,15 +69,16 @@ def _categories_to_start_urls(
     If an item already looks like a URL, use it as-is.
     Otherwise, build an Alibaba search URL for that keyword.
     """
-    out = []
-    for c in _normalize_categories(categories):
-        lc = c.lower()
-        if lc.startswith("http://") or lc.startswith("https://"):
-            out.append({"url": c})
-        else:
-            url = _build_alibaba_search_url(c)
-            out.append({"url": url})
-    return out
+    return [
+        {
+            "url": (
+                c
+                if c[:8].lower().startswith(_URL_SCHEMES)
+                else _build_alibaba_search_url(c)
+            )
+        }
+        for c in normalize_categories(categories)
+    ]
 
 
 def run(
@@ -90,7 +86,8 @@ def run(
     *,
     max_items: int = 10000,
     proxy_use_apify: bool = True,
-    apify_proxy_groups: Optional[List[str]] = None,
+    apify_proxy_groups: Optional[Sequence[str]] = None,
+    run_ts: Optional[str] = None,
 ) -> dict:
     """
     Start Alibaba actor with generated run_input.
@@ -101,16 +98,18 @@ def run(
     max_items: maximum items to fetch (actor param "maxItems")
     proxy_use_apify: whether to enable Apify proxy in proxyConfiguration
     apify_proxy_groups: optional list of Apify proxy groups (e.g. ["RESIDENTIAL"])
+    run_ts: optional UTC timestamp (YYYYmmddTHHMMSSZ) for output file names; defaults to now
     """
-    cats = _normalize_categories(categories)
-    if not cats:
-        raise ValueError("No categories provided to run()")
+    from utils.apify_client import run_actor_and_save
 
     # Default proxy groups when using Apify proxy
     if apify_proxy_groups is None:
-        apify_proxy_groups = ["RESIDENTIAL"]
+        apify_proxy_groups = _DEFAULT_PROXY_GROUPS
+
+    start_urls = _categories_to_start_urls(categories)
+    if not start_urls:
+        raise ValueError("No categories provided to run()")
 
-    start_urls = _categories_to_start_urls(cats)
     logger.info(
         "Prepared Alibaba start URLs",
         extra={"start_url_count": len(start_urls), "start_urls_sample": start_urls[:3]},
@@ -126,7 +125,7 @@ def run(
     }
 
     # Prepare output paths
-    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    ts = run_ts or time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
     out_dir = Path(settings.DATA_DIR) / "alibaba"
     out_dir.mkdir(parents=True, exist_ok=True)
     run_meta_path = out_dir / f"alibaba_run_{ts}.json"
@@ -135,8 +134,8 @@ def run(
         "Starting Alibaba actor run", extra={"run_meta_path": str(run_meta_path)}
     )
 
-    # Note: the utils.apify_client.run_actor_and_save helper expects an actor_key defined in config.ACTORS.
-    # Make sure you set ALIBABA_ACTOR in your .env and config/settings.py maps to 'alibaba' key.
+    # Note: the utils.apify_client.run_actor_and_save helper resolves actor_key via settings.actor_for().
+    # Make sure you set ALIBABA_ACTOR in your .env.
     run_obj = run_actor_and_save(actor_key="alibaba", input_=run_input)
 
     logger.info(
@@ -147,26 +146,9 @@ def run(
     return run_obj
 
 
-def _read_categories_from_file(path: str) -> List[str]:
-    p = Path(path)
-    if not p.exists():
-        raise FileNotFoundError(f"Categories file not found: {path}")
-    with p.open("r", encoding="utf-8") as fh:
-        return [ln.strip() for ln in fh if ln.strip()]
-
-
 def _parse_cli_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(
-        description="Run Alibaba Apify actor for categories or URLs."
-    )
-    group = parser.add_mutually_exclusive_group(required=True)
-    group.add_argument(
-        "--categories", help="Comma-separated categories or URLs", type=str
-    )
-    group.add_argument(
-        "--categories-file",
-        help="Path to file with one category/URL per line",
-        type=str,
+    parser = build_common_argparser(
+        "Run Alibaba Apify actor for categories or URLs."
     )
     parser.add_argument(
         "--max-items", type=int, default=10000, help="Max items (actor param)"
@@ -195,10 +177,7 @@ def _parse_cli_args() -> argparse.Namespace:
 
 if __name__ == "__main__":
     args = _parse_cli_args()
-    if args.categories:
-        categories_list = [c.strip() for c in args.categories.split(",") if c.strip()]
-    else:
-        categories_list = _read_categories_from_file(args.categories_file)
+    categories_list = categories_from_args(args)
 
     proxy_groups = [g.strip() for g in args.proxy_groups.split(",") if g.strip()]
 
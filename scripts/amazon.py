@@ -8,17 +8,22 @@ Provides:
 """
 from __future__ import annotations
 
-import argparse
-import json
-from datetime import datetime, timezone
+import time
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import TYPE_CHECKING, Iterable, List, Optional
 
 from urllib.parse import quote_plus
 
 from config.settings import settings
+from utils.cli import (
+    build_common_argparser,
+    categories_from_args,
+    normalize_categories,
+)
 from utils.logger import get_logger
-from utils.apify_client import run_actor_and_save
+
+if TYPE_CHECKING:
+    import argparse
 
 
 # Default actor key as used in utils.apify_client.run_actor_and_save
@@ -26,15 +31,21 @@ ACTOR_KEY = "amazon"
 
 logger = get_logger(ACTOR_KEY)
 
-
-def _build_amazon_search_url(query: str) -> str:
-    """Return an Amazon search URL for a given query string."""
-    q = quote_plus(query.strip())
-    return f"https://www.amazon.com/s?k={q}"
+# Actor input fields that never change between runs; merged into each run_input.
+_AMAZON_STATIC_INPUT = {
+    "language": "en",
+    "maxOffers": 0,
+    "scrapeSellers": False,
+    "ensureLoadedProductDescriptionFields": False,
+    "scrapeProductVariantPrices": False,
+    "countryCode": "US",
+    "zipCode": None,
+    "locationDeliverableRoutes": ("PRODUCT", "SEARCH", "OFFERS"),
+}
 
 
-def _normalize_categories(categories: Iterable[str]) -> List[str]:
-    return [c.strip() for c in categories if c and c.strip()]
+# Amazon search URL for an already URL-encoded query (bound str.format).
+_AMAZON_SEARCH_URL = "https://www.amazon.com/s?k={}".format
 
 
 def run(
@@ -45,6 +56,7 @@ def run(
     use_captcha_solver: bool = False,
     scrape_product_details: bool = True,
     proxy_country: str = "AUTO_SELECT_PROXY_COUNTRY",
+    run_ts: Optional[str] = None,
 ) -> dict:
     """
     Kick off the Amazon actor with a search URL for each category.
@@ -57,38 +69,31 @@ def run(
       - scrape_product_details: actor input param
       - proxy_country: actor input param
       - output_dir: where to save the run metadata and dataset (defaults to settings.DATA_DIR)
+      - run_ts: optional UTC timestamp (YYYYmmddTHHMMSSZ) for output file names; defaults to now
 
     Returns:
       Apify run object (dict) returned by run_actor_and_save (may be blocking).
     """
-    cats = _normalize_categories(categories)
-    if not cats:
-        raise ValueError("No categories provided to run()")
+    from utils.apify_client import run_actor_and_save
 
-    start_urls = [{"url": _build_amazon_search_url(c)} for c in cats]
+    start_urls = [
+        {"url": _AMAZON_SEARCH_URL(quote_plus(c))}
+        for c in normalize_categories(categories)
+    ]
+    if not start_urls:
+        raise ValueError("No categories provided to run()")
 
     run_input = {
+        **_AMAZON_STATIC_INPUT,
         "categoryOrProductUrls": start_urls,
         "maxItemsPerStartUrl": int(max_items_per_start),
-        "language": "en",
         "proxyCountry": proxy_country,
         "maxSearchPagesPerStartUrl": int(max_search_pages_per_start_url),
-        "maxOffers": 0,
-        "scrapeSellers": False,
-        "ensureLoadedProductDescriptionFields": False,
         "useCaptchaSolver": bool(use_captcha_solver),
-        "scrapeProductVariantPrices": False,
         "scrapeProductDetails": bool(scrape_product_details),
-        "countryCode": "US",
-        "zipCode": None,
-        "locationDeliverableRoutes": [
-            "PRODUCT",
-            "SEARCH",
-            "OFFERS",
-        ],
     }
 
-    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    ts = run_ts or time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
     out_dir = Path(settings.DATA_DIR)
     out_dir.mkdir(parents=True, exist_ok=True)
     run_meta_path = out_dir / f"amazon_run_{ts}.json"
@@ -112,27 +117,11 @@ def run(
     return run_obj
 
 
-def _read_categories_from_file(path: str) -> List[str]:
-    p = Path(path)
-    if not p.exists():
-        raise FileNotFoundError(f"Categories file not found: {path}")
-    with p.open("r", encoding="utf-8") as fh:
-        lines = [ln.strip() for ln in fh if ln.strip()]
-    return lines
-
-
 def _parse_cli_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(
-        description="Run Amazon Apify actor for a list of categories."
-    )
-    group = parser.add_mutually_exclusive_group(required=True)
-    group.add_argument(
-        "--categories",
-        help="Comma-separated categories (e.g. 'ginger,turmeric')",
-        type=str,
-    )
-    group.add_argument(
-        "--categories-file", help="Path to file with one category per line", type=str
+    parser = build_common_argparser(
+        "Run Amazon Apify actor for a list of categories.",
+        categories_help="Comma-separated categories (e.g. 'ginger,turmeric')",
+        categories_file_help="Path to file with one category per line",
     )
     parser.add_argument("--max-items-per-start", type=int, default=100)
     parser.add_argument(
@@ -158,10 +147,7 @@ def _parse_cli_args() -> argparse.Namespace:
 
 if __name__ == "__main__":
     args = _parse_cli_args()
-    if args.categories:
-        categories_list = [c.strip() for c in args.categories.split(",") if c.strip()]
-    else:
-        categories_list = _read_categories_from_file(args.categories_file)
+    categories_list = categories_from_args(args)
 
     try:
         run(categories_list, max_items_per_start=args.max_items_per_start)
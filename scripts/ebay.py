@@ -12,37 +12,42 @@ Behavior:
 """
 from __future__ import annotations
 
-import argparse
-from datetime import datetime, timezone
+import time
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import TYPE_CHECKING, Iterable, List, Optional
 from urllib.parse import quote_plus
 
+from utils.cli import (
+    build_common_argparser,
+    categories_from_args,
+    normalize_categories,
+)
 from utils.logger import get_logger
 from config.settings import settings
-from utils.apify_client import run_actor_and_save
+
+if TYPE_CHECKING:
+    import argparse
 
 logger = get_logger("ebay")
 
+# Entries starting with one of these are passed through as start URLs.
+_URL_SCHEMES = ("http://", "https://")
 
-def _build_ebay_search_url(query: str) -> str:
-    q = quote_plus(query.strip())
-    return f"https://www.ebay.com/sch/i.html?_nkw={q}&_sacat=0&_from=R40&_odkw={q}"
+# Apify proxy groups used for every eBay run.
+_PROXY_GROUPS = ("RESIDENTIAL",)
 
 
-def _normalize_categories(categories: Iterable[str]) -> List[str]:
-    return [str(c).strip() for c in categories if c and str(c).strip()]
+# eBay search URL for an already URL-encoded query (bound str.format).
+_EBAY_SEARCH_URL = (
+    "https://www.ebay.com/sch/i.html?_nkw={0}&_sacat=0&_from=R40&_odkw={0}".format
+)
 
 
 def _categories_to_start_urls(categories: Iterable[str]) -> List[str]:
-    start_urls: List[str] = []
-    for c in _normalize_categories(categories):
-        lower = c.lower()
-        if lower.startswith("http://") or lower.startswith("https://"):
-            start_urls.append(c)
-        else:
-            start_urls.append(_build_ebay_search_url(c))
-    return start_urls
+    return [
+        c if c[:8].lower().startswith(_URL_SCHEMES) else _EBAY_SEARCH_URL(quote_plus(c))
+        for c in normalize_categories(categories)
+    ]
 
 
 def run(
@@ -50,6 +55,7 @@ def run(
     *,
     max_items: int = 10000,
     proxy_use_apify: bool = True,
+    run_ts: Optional[str] = None,
 ) -> dict:
     """
     Start the eBay actor with startUrls derived from categories.
@@ -62,17 +68,21 @@ def run(
         Actor input 'maxItems'.
     proxy_use_apify:
         Whether to use Apify proxy.
+    run_ts:
+        Optional UTC timestamp (YYYYmmddTHHMMSSZ) used in output file names, so a
+        caller dispatching several actors can share one; defaults to now.
 
     Returns
     -------
     dict
         The run object returned by the Apify wrapper.
     """
-    cats = _normalize_categories(categories)
-    if not cats:
+    from utils.apify_client import run_actor_and_save
+
+    start_urls = [{"url": u} for u in _categories_to_start_urls(categories)]
+    if not start_urls:
         raise ValueError("No categories provided to run()")
 
-    start_urls = [{"url": u} for u in _categories_to_start_urls(cats)]
     logger.info(
         "Prepared eBay start URLs",
         extra={"start_url_count": len(start_urls), "start_urls_sample": start_urls[:3]},
@@ -83,12 +93,12 @@ def run(
         "maxItems": int(max_items),
         "proxyConfig": {
             "useApifyProxy": bool(proxy_use_apify),
-            "apifyProxyGroups": ["RESIDENTIAL"],
+            "apifyProxyGroups": _PROXY_GROUPS,
         },
     }
 
     # Timestamped output paths
-    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    ts = run_ts or time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
     out_dir = Path(settings.DATA_DIR) / "ebay"
     out_dir.mkdir(parents=True, exist_ok=True)
     run_meta_path = out_dir / f"ebay_run_{ts}.json"
@@ -107,26 +117,9 @@ def run(
     return run_obj
 
 
-def _read_categories_from_file(path: str) -> List[str]:
-    p = Path(path)
-    if not p.exists():
-        raise FileNotFoundError(f"Categories file not found: {path}")
-    with p.open("r", encoding="utf-8") as fh:
-        return [ln.strip() for ln in fh if ln.strip()]
-
-
 def _parse_cli_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(
-        description="Run eBay Apify actor for a list of categories or URLs."
-    )
-    group = parser.add_mutually_exclusive_group(required=True)
-    group.add_argument(
-        "--categories", help="Comma-separated categories or URLs", type=str
-    )
-    group.add_argument(
-        "--categories-file",
-        help="Path to file with one category/URL per line",
-        type=str,
+    parser = build_common_argparser(
+        "Run eBay Apify actor for a list of categories or URLs."
     )
     parser.add_argument(
         "--max-items", type=int, default=10, help="Max items per start (actor param)"
@@ -143,11 +136,7 @@ def _parse_cli_args() -> argparse.Namespace:
 
 if __name__ == "__main__":
     args = _parse_cli_args()
-
-    if args.categories:
-        categories_list = [c.strip() for c in args.categories.split(",") if c.strip()]
-    else:
-        categories_list = _read_categories_from_file(args.categories_file)
+    categories_list = categories_from_args(args)
 
     try:
         run(
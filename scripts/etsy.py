@@ -20,50 +20,57 @@ Example (CLI):
 """
 from __future__ import annotations
 
-import argparse
-from datetime import datetime, timezone
+import time
+from functools import partial
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Optional, Sequence
 from urllib.parse import quote_plus
 
+from utils.cli import build_common_argparser, categories_from_args
+from utils.concurrency import gather_blocking
+from utils.io import ensure_dir
 from utils.logger import get_logger
+from utils.url_normalize import canonicalize
 from config.settings import settings
 from utils.apify_client import run_actor_and_save
 
+if TYPE_CHECKING:
+    import argparse
+
 logger = get_logger("etsy")
 
+# Output directory for timestamped run metadata; created on first run, not at import
+_ETSY_DIR = Path(settings.DATA_DIR) / "etsy"
 
-def _build_etsy_search_url(query: str) -> str:
-    """Return an Etsy search URL for a given query string."""
-    q = quote_plus(query.strip())
-    return f"https://www.etsy.com/search?q={q}"
 
+# Etsy search URL for an already URL-encoded query (bound str.format).
+_ETSY_SEARCH_URL = "https://www.etsy.com/search?q={}".format
 
-def _normalize_categories(categories: Iterable[str]) -> List[str]:
-    items = []
-    for c in categories:
-        if not c:
-            continue
-        s = str(c).strip()
-        if not s:
-            continue
-        items.append(s)
-    return items
+_URL_SCHEMES = ("http://", "https://")
 
 
-def _categories_to_start_urls(categories: Iterable[str]) -> List[str]:
+def _iter_start_urls(categories: Iterable[str]) -> Iterator[str]:
     """
-    Convert categories list into startUrls for the Etsy actor.
-    If an entry already looks like a URL (starts with http/https) it is used as-is.
-    Otherwise it's converted to an Etsy search URL.
+    Yield unique startUrls for the Etsy actor in one pass over categories.
+    Entries are stripped and empty ones skipped. If an entry already looks like a
+    URL (starts with http/https) it is canonicalized (utils.url_normalize) so
+    equivalent spellings collapse; otherwise it's converted to an Etsy search URL
+    for the lowercased, whitespace-collapsed query, so that "Apple Watch " and
+    "apple watch" don't spend the actor's budget twice.
     """
-    start_urls: List[str] = []
-    for c in _normalize_categories(categories):
-        if c.lower().startswith("http://") or c.lower().startswith("https://"):
-            start_urls.append(c)
+    qp, search_url = quote_plus, _ETSY_SEARCH_URL
+    seen = set()
+    for c in categories:
+        s = str(c).strip() if c else ""
+        if not s:
+            continue
+        if s[:8].lower().startswith(_URL_SCHEMES):
+            url = canonicalize(s)
         else:
-            start_urls.append(_build_etsy_search_url(c))
-    return start_urls
+            url = search_url(qp(" ".join(s.lower().split())))
+        if url not in seen:
+            seen.add(url)
+            yield url
 
 
 def run(
@@ -76,6 +83,8 @@ def run(
     apify_proxy_groups: Optional[List[str]] = None,
     extend_output_function: Optional[str] = None,
     custom_map_function: Optional[str] = None,
+    run_ts: Optional[str] = None,
+    output_name: Optional[str] = None,
 ) -> dict:
     """
     Start the Etsy actor with startUrls derived from categories and the provided options.
@@ -100,17 +109,22 @@ def run(
         Optional JS string provided to the actor to extend output per page (as in example).
     custom_map_function:
         Optional JS string to transform objects (as in example).
+    run_ts:
+        Optional UTC timestamp (YYYYmmddTHHMMSSZ) used in output file names, so a
+        caller dispatching several actors can share one; defaults to now.
+    output_name:
+        File stem for the saved run metadata and dataset (defaults to "etsy"). Runs
+        that may overlap need distinct names so they don't overwrite each other.
 
     Returns
     -------
     dict:
         The run object returned by the Apify wrapper.
     """
-    cats = _normalize_categories(categories)
-    if not cats:
+    start_urls = list(_iter_start_urls(categories))
+    if not start_urls:
         raise ValueError("No categories provided to run()")
 
-    start_urls = _categories_to_start_urls(cats)
     logger.info(
         "Prepared Etsy start URLs",
         extra={"start_url_count": len(start_urls)},
@@ -138,10 +152,8 @@ def run(
     # Clean None values (actor may accept null but keep payload tidy)
     payload = {k: v for k, v in run_input.items() if v is not None}
 
-    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-    out_dir = Path(settings.DATA_DIR) / "etsy"
-    out_dir.mkdir(parents=True, exist_ok=True)
-    run_meta_path = out_dir / f"etsy_run_{ts}.json"
+    ts = run_ts or time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    run_meta_path = ensure_dir(_ETSY_DIR) / f"{output_name or 'etsy'}_run_{ts}.json"
 
     logger.info(
         "Starting Etsy actor run",
@@ -152,9 +164,11 @@ def run(
     )
 
     # Delegate to the shared Apify wrapper; it handles saving run metadata & dataset.
-    run_obj = run_actor_and_save(actor_key="etsy", input_=payload)
+    run_obj = run_actor_and_save(
+        actor_key="etsy", output_name=output_name, input_=payload
+    )
 
-    # The apify wrapper writes metadata to data/etsy/etsy.json and dataset to data/etsy/raw/etsy.dataset.json.
+    # The apify wrapper writes metadata to data/etsy/<output_name>.json and dataset to data/etsy/raw/<output_name>.dataset.jsonl.gz.
     # For convenience also save a timestamped copy of the run metadata next to it.
     try:
         with open(run_meta_path, "w", encoding="utf-8") as fh:
@@ -178,26 +192,41 @@ def run(
     return run_obj
 
 
-def _read_categories_from_file(path: str) -> List[str]:
-    p = Path(path)
-    if not p.exists():
-        raise FileNotFoundError(f"Categories file not found: {path}")
-    with p.open("r", encoding="utf-8") as fh:
-        return [ln.strip() for ln in fh if ln.strip()]
+async def run_many(
+    categories_groups: Sequence[Sequence[str]],
+    *,
+    max_concurrency: int = 5,
+    **kwargs: Any,
+) -> List[dict]:
+    """
+    Start one Etsy actor run per category group, at most `max_concurrency` at a time.
+
+    Parameters
+    ----------
+    categories_groups:
+        One iterable of categories/URLs per actor run.
+    max_concurrency:
+        Maximum number of actor runs in flight at once.
+    **kwargs:
+        Passed to run() for every group (e.g. max_items). Each run gets its own
+        output_name ("etsy_<index>") and all share one run_ts.
+
+    Returns
+    -------
+    list
+        The run objects, in the order of `categories_groups`.
+    """
+    ts = kwargs.pop("run_ts", None) or time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    calls = [
+        partial(run, group, run_ts=ts, output_name=f"etsy_{i}", **kwargs)
+        for i, group in enumerate(categories_groups)
+    ]
+    return await gather_blocking(calls, max_concurrency=max_concurrency)
 
 
 def _parse_cli_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(
-        description="Run Etsy Apify actor for a list of categories or URLs."
-    )
-    group = parser.add_mutually_exclusive_group(required=True)
-    group.add_argument(
-        "--categories", help="Comma-separated categories or URLs", type=str
-    )
-    group.add_argument(
-        "--categories-file",
-        help="Path to file with one category/URL per line",
-        type=str,
+    parser = build_common_argparser(
+        "Run Etsy Apify actor for a list of categories or URLs."
     )
     parser.add_argument(
         "--max-items", type=int, default=10000, help="Max items per start (actor param)"
@@ -229,11 +258,7 @@ def _parse_cli_args() -> argparse.Namespace:
 
 if __name__ == "__main__":
     args = _parse_cli_args()
-
-    if args.categories:
-        categories_list = [c.strip() for c in args.categories.split(",") if c.strip()]
-    else:
-        categories_list = _read_categories_from_file(args.categories_file)
+    categories_list = categories_from_args(args)
 
     proxy_groups = [g.strip() for g in args.proxy_groups.split(",") if g.strip()]
 
@@ -12,44 +12,57 @@ Behavior:
 """
 from __future__ import annotations
 
-import argparse
-from datetime import datetime, timezone
+import time
+from functools import partial
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Optional, Sequence
 from urllib.parse import quote_plus
 
 from config.settings import settings
+from utils.cli import build_common_argparser, categories_from_args
+from utils.concurrency import gather_blocking
+from utils.io import ensure_dir
 from utils.logger import get_logger
+from utils.url_normalize import canonicalize
 from utils.apify_client import run_actor_and_save
 
-logger = get_logger("jumia")
+if TYPE_CHECKING:
+    import argparse
 
+logger = get_logger("jumia")
 
-def _build_jumia_search_url(query: str, domain: str = "www.jumia.com.ng") -> str:
-    """Return a Jumia search URL for a given query string and domain."""
-    q = quote_plus(query.strip())
-    return f"https://{domain}/catalog/?q={q}"
+# Output directory for timestamped run metadata; created on first run, not at import
+_JUMIA_DIR = Path(settings.DATA_DIR) / "jumia"
 
 
-def _normalize_categories(categories: Iterable[str]) -> List[str]:
-    return [str(c).strip() for c in categories if c and str(c).strip()]
+_URL_SCHEMES = ("http://", "https://")
 
 
-def _categories_to_search_urls(
+def _iter_search_urls(
     categories: Iterable[str], domain: str = "www.jumia.com.ng"
-) -> List[str]:
+) -> Iterator[str]:
     """
-    Convert category strings or full URLs into a list of searchUrls for actor input.
-    If an item already looks like a URL (starts with http/https) it is used as-is.
+    Yield unique searchUrls for actor input in one pass over categories.
+    Entries are stripped and empty ones skipped. If an item already looks like a
+    URL (starts with http/https) it is canonicalized (utils.url_normalize) so
+    equivalent spellings collapse; otherwise it becomes a search URL on `domain`
+    for the lowercased, whitespace-collapsed query, so duplicate queries
+    differing only in case/spacing are sent once.
     """
-    out: List[str] = []
-    for c in _normalize_categories(categories):
-        lower = c.lower()
-        if lower.startswith("http://") or lower.startswith("https://"):
-            out.append(c)
+    qp = quote_plus
+    prefix = f"https://{domain}/catalog/?q="
+    seen = set()
+    for c in categories:
+        s = str(c).strip() if c else ""
+        if not s:
+            continue
+        if s[:8].lower().startswith(_URL_SCHEMES):
+            url = canonicalize(s)
         else:
-            out.append(_build_jumia_search_url(c, domain=domain))
-    return out
+            url = prefix + qp(" ".join(s.lower().split()))
+        if url not in seen:
+            seen.add(url)
+            yield url
 
 
 def run(
@@ -59,6 +72,8 @@ def run(
     proxy_use_apify: bool = True,
     apify_proxy_groups: Optional[List[str]] = None,
     domain: str = "www.jumia.com.ng",
+    run_ts: Optional[str] = None,
+    output_name: Optional[str] = None,
 ) -> dict:
     """
     Start the Jumia actor with searchUrls derived from categories.
@@ -75,17 +90,22 @@ def run(
         Optional list of Apify proxy groups (defaults to ["RESIDENTIAL"]).
     domain:
         Jumia domain to target (e.g., 'www.jumia.com.ng', 'www.jumia.co.ke').
+    run_ts:
+        Optional UTC timestamp (YYYYmmddTHHMMSSZ) used in output file names, so a
+        caller dispatching several actors can share one; defaults to now.
+    output_name:
+        File stem for the saved run metadata and dataset (defaults to "jumia"). Runs
+        that may overlap need distinct names so they don't overwrite each other.
 
     Returns
     -------
     dict
         The run object returned by the Apify wrapper.
     """
-    cats = _normalize_categories(categories)
-    if not cats:
+    search_urls = list(_iter_search_urls(categories, domain=domain))
+    if not search_urls:
         raise ValueError("No categories provided to run()")
 
-    search_urls = _categories_to_search_urls(cats, domain=domain)
     logger.info(
         "Prepared Jumia search URLs",
         extra={
@@ -107,15 +127,15 @@ def run(
     }
 
     # Timestamped output path
-    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
-    out_dir = Path(settings.DATA_DIR) / "jumia"
-    out_dir.mkdir(parents=True, exist_ok=True)
-    run_meta_path = out_dir / f"jumia_run_{ts}.json"
+    ts = run_ts or time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    run_meta_path = ensure_dir(_JUMIA_DIR) / f"{output_name or 'jumia'}_run_{ts}.json"
 
     logger.info("Starting Jumia actor run", extra={"run_meta_path": str(run_meta_path)})
 
-    # Use the shared apify wrapper. Make sure 'jumia' is present in config.ACTORS mapping.
-    run_obj = run_actor_and_save(actor_key="jumia", input_=run_input)
+    # Use the shared apify wrapper. Make sure JUMIA_ACTOR is set in your .env.
+    run_obj = run_actor_and_save(
+        actor_key="jumia", output_name=output_name, input_=run_input
+    )
 
     run_id = run_obj.get("id") or (run_obj.get("data") or {}).get("id")
     logger.info(
@@ -126,26 +146,41 @@ def run(
     return run_obj
 
 
-def _read_categories_from_file(path: str) -> List[str]:
-    p = Path(path)
-    if not p.exists():
-        raise FileNotFoundError(f"Categories file not found: {path}")
-    with p.open("r", encoding="utf-8") as fh:
-        return [ln.strip() for ln in fh if ln.strip()]
+async def run_many(
+    categories_groups: Sequence[Sequence[str]],
+    *,
+    max_concurrency: int = 5,
+    **kwargs: Any,
+) -> List[dict]:
+    """
+    Start one Jumia actor run per category group, at most `max_concurrency` at a time.
+
+    Parameters
+    ----------
+    categories_groups:
+        One iterable of categories/URLs per actor run.
+    max_concurrency:
+        Maximum number of actor runs in flight at once.
+    **kwargs:
+        Passed to run() for every group (e.g. max_items). Each run gets its own
+        output_name ("jumia_<index>") and all share one run_ts.
+
+    Returns
+    -------
+    list
+        The run objects, in the order of `categories_groups`.
+    """
+    ts = kwargs.pop("run_ts", None) or time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    calls = [
+        partial(run, group, run_ts=ts, output_name=f"jumia_{i}", **kwargs)
+        for i, group in enumerate(categories_groups)
+    ]
+    return await gather_blocking(calls, max_concurrency=max_concurrency)
 
 
 def _parse_cli_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(
-        description="Run Jumia Apify actor for a list of categories or search URLs."
-    )
-    group = parser.add_mutually_exclusive_group(required=True)
-    group.add_argument(
-        "--categories", help="Comma-separated categories or URLs", type=str
-    )
-    group.add_argument(
-        "--categories-file",
-        help="Path to file with one category/URL per line",
-        type=str,
+    parser = build_common_argparser(
+        "Run Jumia Apify actor for a list of categories or search URLs."
     )
     parser.add_argument(
         "--max-items", type=int, default=100, help="Max items to fetch (actor param)"
@@ -174,11 +209,7 @@ def _parse_cli_args() -> argparse.Namespace:
 
 if __name__ == "__main__":
     args = _parse_cli_args()
-
-    if args.categories:
-        categories_list = [c.strip() for c in args.categories.split(",") if c.strip()]
-    else:
-        categories_list = _read_categories_from_file(args.categories_file)
+    categories_list = categories_from_args(args)
 
     proxy_groups = [g.strip() for g in args.proxy_groups.split(",") if g.strip()]
 
@@ -6,69 +6,112 @@ Usage:
   python tools/process_batch_output.py --batch-jsonl path/to/batch_output.jsonl --template-csv templates/normalized_template.csv
 
 If --output-csv omitted, the script writes the CSV next to the input file replacing .jsonl -> .csv.
+
+The module is fully annotated so it can be compiled ahead of time with mypyc for
+faster parsing loops (the extension module is picked up in place of this file):
+  mypyc --ignore-missing-imports --follow-imports=skip scripts/process_batch.py
 """
 
 from __future__ import annotations
 import argparse
 import csv
-import json
+import io
 import logging
+import mmap
+import os
+from collections import deque
+from itertools import chain
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import orjson
+
 from utils.logger import get_logger
 
 
 logger = get_logger("process_batch")
 
 
-def _extract_content_from_line(obj: Dict[str, Any]) -> Optional[str]:
+def _deep_search_content(obj: Any) -> Optional[str]:
+    """
+    Depth-first search (in key order) of nested dicts/lists for a 'content' string
+    that looks like JSON. Uses an explicit stack of iterators instead of recursion.
+    """
+    if not isinstance(obj, dict):
+        return None
+    stack: List[Iterator[Tuple[Any, Any]]] = [iter(obj.items())]
+    while stack:
+        for k, v in stack[-1]:
+            if (
+                k == "content"
+                and isinstance(v, str)
+                and ("{" in v or "]" in v or '"' in v)
+            ):
+                return v
+            if isinstance(v, dict):
+                stack.append(iter(v.items()))
+                break
+            if isinstance(v, list):
+                # dicts inside a list are searched one after another
+                stack.append(
+                    chain.from_iterable(i.items() for i in v if isinstance(i, dict))
+                )
+                break
+        else:
+            stack.pop()
+    return None
+
+
+def _extract_content_from_line(
+    obj: Dict[str, Any],
+) -> Optional[Union[str, Dict[str, Any]]]:
     """
-    Given one parsed JSONL line (dict), extract the assistant content string if present.
+    Given one parsed JSONL line (dict), extract the assistant content if present.
     Handles nested shapes like response.body.choices[0].message.content.
+    Returns the content string to be parsed, or the dict itself when the content
+    was already stored as parsed JSON.
     """
-    # Common path in portal JSONL: obj["response"]["body"]["choices"][0]["message"]["content"]
+    # Fast path, covers portal JSONL: obj["response"]["body"]["choices"][0]["message"]["content"]
+    try:
+        content = obj["response"]["body"]["choices"][0]["message"]["content"]
+        if content:
+            return content
+    except (KeyError, TypeError, IndexError):
+        pass
+
     try:
         resp = obj.get("response") or {}
         body = resp.get("body") or {}
         choices = body.get("choices") or []
         if choices and isinstance(choices, list):
             first = choices[0]
-            # message may be dict-like
-            msg = first.get("message") or {}
-            content = msg.get("content")
-            if content:
-                return content
-            # fallback: some SDKs put the textual output under 'text' or 'message'->'text'
-            if first.get("text"):
-                return first.get("text")
-            if isinstance(msg, str):
+            # fallback: some SDKs put the textual output under 'text', or make
+            # 'message' the string itself
+            text = first.get("text")
+            if text:
+                return text
+            msg = first.get("message")
+            if isinstance(msg, str) and msg:
                 return msg
         # other fallback locations
         if "content" in obj:
             return obj["content"]
-
         # deep fallback: search nested dicts for a 'content' string
-        def search_for_content(d):
-            if isinstance(d, dict):
-                for k, v in d.items():
-                    if (
-                        k == "content"
-                        and isinstance(v, str)
-                        and ("{" in v or "]" in v or '"' in v)
-                    ):
-                        return v
-                    if isinstance(v, dict):
-                        found = search_for_content(v)
-                        if found:
-                            return found
-                    if isinstance(v, list):
-                        for item in v:
-                            found = search_for_content(item)
-                            if found:
-                                return found
-            return None
-
-        return search_for_content(obj)
+        return _deep_search_content(obj)
     except Exception as e:
         logger.exception("Error extracting content", extra={"error": str(e)})
         return None
@@ -81,12 +124,12 @@ def _extract_json_from_content(content: str) -> Optional[Dict[str, Any]]:
     if not content:
         return None
     txt = content.strip()
-    # strip markdown/code fences if present
+    # strip markdown/code fences if present: drop the opening ```lang line and the
+    # closing ``` with a single slice
     if txt.startswith("```") and txt.endswith("```"):
-        # remove outer fences
-        parts = txt.splitlines()
-        if len(parts) >= 3:
-            txt = "\n".join(parts[1:-1]).strip()
+        body_start = txt.find("\n") + 1
+        if 0 < body_start <= len(txt) - 3:
+            txt = txt[body_start:-3].strip()
     # find JSON object substring (first { ... last })
     first = txt.find("{")
     last = txt.rfind("}")
@@ -95,70 +138,264 @@ def _extract_json_from_content(content: str) -> Optional[Dict[str, Any]]:
     else:
         candidate = txt
     try:
-        parsed = json.loads(candidate)
+        parsed = orjson.loads(candidate)
         if isinstance(parsed, dict):
             return parsed
         # sometimes model returns top-level array - not expected, but try first element
-        if isinstance(parsed, list) and parsed:
-            if isinstance(parsed[0], dict):
-                return parsed[0]
-            return None
-    except Exception:
-        # last effort: try to replace some common escaped quotes
+        if isinstance(parsed, list) and parsed and isinstance(parsed[0], dict):
+            return parsed[0]
+        return None
+    except orjson.JSONDecodeError:
+        pass
+    # last effort: unescape over-escaped quotes; skip the re-parse when there are none
+    if '\\"' in candidate:
         try:
-            candidate2 = candidate.replace('\\"', '"')
-            parsed = json.loads(candidate2)
-            if isinstance(parsed, dict):
-                return parsed
-        except Exception:
-            logger.debug(
-                "Failed to JSON-parse model content", extra={"snippet": candidate[:300]}
-            )
-            return None
+            parsed = orjson.loads(candidate.replace('\\"', '"'))
+            return parsed if isinstance(parsed, dict) else None
+        except orjson.JSONDecodeError:
+            pass
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "Failed to JSON-parse model content", extra={"snippet": candidate[:300]}
+        )
     return None
 
 
-def _value_for_header(parsed: Dict[str, Any], header_key: str) -> Any:
+def _header_variants(header_key: str) -> Tuple[str, ...]:
     """
-    Look up header_key in parsed dict with some tolerant matching:
+    Keys to probe in a parsed dict for header_key, in priority order:
     - exact match
     - lowercase matching
     - underscore/space variants
+    Computed once per template column rather than per row.
     """
-    if parsed is None:
-        return None
-    # exact
-    if header_key in parsed:
-        return parsed[header_key]
-    # try lowercase key
-    lk = header_key.lower()
-    if lk in parsed:
-        return parsed[lk]
-    # try key variants
     alt1 = header_key.replace(" ", "_")
-    if alt1 in parsed:
-        return parsed[alt1]
-    if alt1.lower() in parsed:
-        return parsed[alt1.lower()]
     alt2 = header_key.replace(" ", "")
-    if alt2 in parsed:
-        return parsed[alt2]
-    if alt2.lower() in parsed:
-        return parsed[alt2.lower()]
-    # try simple fallback: check keys case-insensitively
+    return tuple(
+        dict.fromkeys(
+            (header_key, header_key.lower(), alt1, alt1.lower(), alt2, alt2.lower())
+        )
+    )
+
+
+def _fold_keys(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    """Map stripped, lowercased keys to values (first occurrence wins)."""
+    folded: Dict[str, Any] = {}
     for k, v in parsed.items():
-        if isinstance(k, str) and k.strip().lower() == lk:
-            return v
-    return None
+        if isinstance(k, str):
+            folded.setdefault(k.strip().lower(), v)
+    return folded
+
+
+# Per-process template state, set by _init_worker (also used for in-process runs)
+_HEADER_VARIANTS: List[Tuple[str, Tuple[str, ...]]] = []
+_PRODUCT_ID_IDX: Optional[int] = None
+_N_COLS = 0
+
+# Byte ranges are capped at this size so each worker result stays small
+CHUNK_BYTES = 8 * 1024 * 1024
+# Below this size the file is processed in-process; pool start-up would dominate
+MIN_PARALLEL_BYTES = 4 * 1024 * 1024
+# CSV output buffer; large so millions of short rows don't each cost a write() call
+WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+
+
+def _json_cell(val: Any) -> str:
+    """Serialize a list/dict to a JSON string so it fits a CSV cell."""
+    try:
+        return orjson.dumps(val).decode()
+    except orjson.JSONEncodeError:
+        return str(val)
+
+
+# Exact-type dispatch for cell values that need converting (None cells stay "").
+# bool is looked up by exact type, so it never falls through to int.
+_CONVERTERS: Dict[type, Callable[[Any], Any]] = {
+    list: _json_cell,
+    dict: _json_cell,
+    # CSV will hold True/False; keep as lowercase string to be explicit
+    bool: lambda v: "true" if v else "false",
+}
+
+
+def _init_worker(header: Sequence[str]) -> None:
+    """Precompute template lookups once per process."""
+    global _HEADER_VARIANTS, _PRODUCT_ID_IDX, _N_COLS
+    # (lowercased column, probe keys) for each template column, in CSV order
+    _HEADER_VARIANTS = [(col.lower(), _header_variants(col)) for col in header]
+    _PRODUCT_ID_IDX = header.index("product ID") if "product ID" in header else None
+    _N_COLS = len(header)
+
+
+def _row_from_line(line: bytes, byte_offset: int) -> Optional[List[Any]]:
+    """Turn one JSONL line into a CSV row in template order; None to skip it.
+
+    `byte_offset` (where the line starts in the file) is only used in log records.
+    """
+    line = line.rstrip(b"\r\n")
+    if not line:
+        return None
+    try:
+        obj = orjson.loads(line)
+    except Exception:
+        # only slice/decode the preview when the warning will actually be emitted
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning(
+                "Skipping non-JSON line",
+                extra={
+                    "byte_offset": byte_offset,
+                    "line_preview": line[:200].decode("utf-8", "replace"),
+                },
+            )
+        return None
+
+    # extract assistant content
+    # (the batch writer occasionally stores it already parsed, as a dict)
+    content = _extract_content_from_line(obj)
+
+    parsed: Optional[Dict[str, Any]]
+    if isinstance(content, dict):
+        parsed = content
+    elif content:
+        parsed = _extract_json_from_content(content)
+    else:
+        parsed = None
+
+    # One presized row per line, filled by column index; cells default to "".
+    row: List[Any] = [""] * _N_COLS
+    if parsed and isinstance(parsed, dict):
+        folded: Optional[Dict[str, Any]] = None
+        for i, (col_lower, variants) in enumerate(_HEADER_VARIANTS):
+            for probe in variants:
+                if probe in parsed:
+                    val = parsed[probe]
+                    break
+            else:
+                # fallback: match keys case-insensitively (built once per row)
+                if folded is None:
+                    folded = _fold_keys(parsed)
+                val = folded.get(col_lower)
+            if val is None:
+                continue
+            conv = _CONVERTERS.get(type(val))
+            row[i] = conv(val) if conv is not None else val
+    else:
+        # parsed is None -> keep the placeholder row of nulls; try to fill product ID or custom_id if available
+        # try to find ids
+        cid = (
+            obj.get("custom_id")
+            or (obj.get("response") or {}).get("request_id")
+            or None
+        )
+        # set product ID field if present in header
+        if _PRODUCT_ID_IDX is not None and cid:
+            row[_PRODUCT_ID_IDX] = cid
+        # if there is a nested 'response' with body->choices->message->content raw string that itself is JSON, we already tried parsing it
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning(
+                "Parsed JSON missing for line; writing placeholder",
+                extra={"byte_offset": byte_offset, "custom_id": cid},
+            )
+    return row
+
+
+# Result of converting one byte range: (CSV text, rows written, lines read)
+RangeResult = Tuple[str, int, int]
+
+
+def _process_range(path: str, start: int, end: int) -> RangeResult:
+    """
+    Convert the lines in bytes [start, end) of the JSONL file to CSV text.
+    Returns (csv_text, rows written, lines read). start must be a line start.
+
+    The file is memory-mapped and split on b"\n" with mmap.find, so line slicing
+    runs in C and each line reaches orjson as bytes without a text decode. Rows are
+    CSV-encoded here (in the worker) so the parent only appends finished text.
+    """
+    buf = io.StringIO(newline="")
+    writer = csv.writer(buf)
+    written = 0
+    count = 0
+    if start >= end:
+        return "", written, count
+    with open(path, "rb") as fh, mmap.mmap(
+        fh.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        pos = start
+        while pos < end:
+            nl = mm.find(b"\n", pos, end)
+            stop = end if nl == -1 else nl
+            count += 1
+            row = _row_from_line(mm[pos:stop], pos)
+            if row is not None:
+                writer.writerow(row)
+                written += 1
+            pos = stop + 1
+    return buf.getvalue(), written, count
+
+
+def _chunk_ranges(path: str, size: int, n_chunks: int) -> List[Tuple[int, int]]:
+    """Split [0, size) into ~n_chunks byte ranges whose boundaries are line starts."""
+    bounds = [0]
+    with open(path, "rb") as fh, mmap.mmap(
+        fh.fileno(), 0, access=mmap.ACCESS_READ
+    ) as mm:
+        for i in range(1, n_chunks):
+            target = size * i // n_chunks
+            if target <= bounds[-1]:
+                continue
+            # snap to the start of the next line
+            nl = mm.find(b"\n", target - 1)
+            if nl == -1 or nl + 1 >= size:
+                break
+            if nl + 1 > bounds[-1]:
+                bounds.append(nl + 1)
+    bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def _ordered_results(
+    pool: ProcessPoolExecutor,
+    path: str,
+    ranges: List[Tuple[int, int]],
+    max_pending: int,
+) -> Iterator[RangeResult]:
+    """Yield _process_range results in file order, keeping at most max_pending in flight."""
+    pending: Deque[Future] = deque()
+    it = iter(ranges)
+    for a, b in it:
+        pending.append(pool.submit(_process_range, path, a, b))
+        if len(pending) >= max_pending:
+            break
+    while pending:
+        result = pending.popleft().result()
+        for a, b in it:
+            pending.append(pool.submit(_process_range, path, a, b))
+            break
+        yield result
+
+
+@lru_cache(maxsize=32)
+def _load_template_header(path_str: str, mtime_ns: int) -> Tuple[str, ...]:
+    """
+    Return the first row of the template CSV. mtime_ns is part of the cache key,
+    so repeated calls (batch of batches) only re-read the file after it changes.
+    """
+    with open(path_str, "r", encoding="utf-8", newline="") as fh:
+        reader = csv.reader(fh)
+        return tuple(next(reader))
 
 
 def process_batch_jsonl_to_csv(
     batch_jsonl_path: Path,
     template_csv_path: Path,
     output_csv_path: Optional[Path] = None,
+    workers: Optional[int] = None,
 ) -> Path:
     """
     Process the batch output JSONL file and write the matching CSV.
+    Lines are parsed in a pool of `workers` processes (default: CPU count) over
+    byte ranges of the file; rows are written in input order by this process.
     Returns path to the written CSV.
     """
     if not batch_jsonl_path.exists():
@@ -170,10 +407,10 @@ def process_batch_jsonl_to_csv(
         else:
             output_csv_path = batch_jsonl_path.parent / (batch_jsonl_path.name + ".csv")
 
-    # read header from template csv (first row)
-    with template_csv_path.open("r", encoding="utf-8", newline="") as fh:
-        reader = csv.reader(fh)
-        header = next(reader)
+    # read header from template csv (first row); cached while the file is unchanged
+    header = _load_template_header(
+        str(template_csv_path), template_csv_path.stat().st_mtime_ns
+    )
 
     logger.info(
         "Processing batch JSONL",
@@ -184,112 +421,44 @@ def process_batch_jsonl_to_csv(
         },
     )
 
+    workers = workers or os.cpu_count() or 1
+    path_str = str(batch_jsonl_path)
+    size = os.path.getsize(path_str)
+
     total = 0
     written = 0
-    with batch_jsonl_path.open("r", encoding="utf-8") as fh_in, output_csv_path.open(
-        "w", encoding="utf-8", newline=""
+    with output_csv_path.open(
+        "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER_SIZE
     ) as fh_out:
-        writer = csv.DictWriter(fh_out, fieldnames=header)
-        writer.writeheader()
-        for line in fh_in:
-            total += 1
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                obj = json.loads(line)
-            except Exception:
-                logger.warning(
-                    "Skipping non-JSON line", extra={"line_preview": line[:200]}
-                )
-                continue
+        writer = csv.writer(fh_out)
+        writer.writerow(header)
 
-            # extract assistant content
-            content_str = _extract_content_from_line(obj)
-
-            parsed = None
-            if content_str:
-                parsed = _extract_json_from_content(content_str)
-
-            # fallback: maybe the batch writer already put the parsed JSON under response.body.choices[0].message.content as parsed dict
-            if parsed is None:
-                # check if content was already a dict in the JSONL (rare)
-                # for example: obj["response"]["body"]["choices"][0]["message"]["content"] might be dict
-                try:
-                    resp = obj.get("response") or {}
-                    body = resp.get("body") or {}
-                    choices = body.get("choices") or []
-                    if choices and isinstance(choices, list):
-                        first = choices[0]
-                        msg = first.get("message") or {}
-                        cont = msg.get("content")
-                        if isinstance(cont, dict):
-                            parsed = cont
-                except Exception:
-                    parsed = None
-
-            # Build CSV row ensuring header keys exist
-            row: Dict[str, Optional[str]] = {}
-            if parsed and isinstance(parsed, dict):
-                for col in header:
-                    val = _value_for_header(parsed, col)
-                    # if it's a list/dict serialize to JSON string (so it fits CSV cell)
-                    if isinstance(val, (list, dict)):
-                        try:
-                            row[col] = json.dumps(val, ensure_ascii=False)
-                        except Exception:
-                            row[col] = str(val)
-                    else:
-                        row[col] = val
-            else:
-                # parsed is None -> create placeholder row filled with nulls; try to fill product ID or custom_id if available
-                placeholder = {c: None for c in header}
-                # try to find ids
-                cid = (
-                    obj.get("custom_id")
-                    or (obj.get("response") or {}).get("request_id")
-                    or None
-                )
-                # try to parse some fields from top-level (rare)
-                top_url = None
-                # set product ID field if present in header
-                if "product ID" in header and cid:
-                    placeholder["product ID"] = cid
-                # if there is a nested 'response' with body->choices->message->content raw string that itself is JSON, we already tried parsing it
-                # write the placeholder
-                row = placeholder  # type: ignore
-                logger.warning(
-                    "Parsed JSON missing for line; writing placeholder",
-                    extra={"line_index": total, "custom_id": cid},
-                )
+        pool: Optional[ProcessPoolExecutor] = None
+        if workers == 1 or size < MIN_PARALLEL_BYTES:
+            _init_worker(header)
+            results: Iterable[RangeResult] = [_process_range(path_str, 0, size)]
+        else:
+            n_chunks = max(workers, -(-size // CHUNK_BYTES))
+            ranges = _chunk_ranges(path_str, size, n_chunks)
+            pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(header,)
+            )
+            results = _ordered_results(pool, path_str, ranges, workers * 2)
 
-            # ensure all header columns are present
-            for k in header:
-                if k not in row:
-                    row[k] = None
-
-            # Finally, convert any lists/dicts still present, and convert boolean -> lowercase true/false if desirable
-            safe_row = {}
-            for k in header:
-                v = row[k]
-                if isinstance(v, (list, dict)):
-                    safe_row[k] = json.dumps(v, ensure_ascii=False)
-                elif isinstance(v, bool):
-                    # CSV will hold True/False; keep as lowercase string to be explicit
-                    safe_row[k] = "true" if v else "false"
-                elif v is None:
-                    safe_row[k] = ""
-                else:
-                    safe_row[k] = v
-            # Write row
-            writer.writerow(safe_row)
-            written += 1
-
-            if written % 100 == 0:
-                logger.info(
-                    "Progress",
-                    extra={"written": written, "total_lines_processed": total},
-                )
+        info_enabled = logger.isEnabledFor(logging.INFO)
+        try:
+            for csv_text, rows_written, count in results:
+                total += count
+                fh_out.write(csv_text)
+                written += rows_written
+                if info_enabled:
+                    logger.info(
+                        "Progress",
+                        extra={"written": written, "total_lines_processed": total},
+                    )
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
 
     logger.info(
         "Done processing batch JSONL",
@@ -302,7 +471,7 @@ def process_batch_jsonl_to_csv(
     return output_csv_path
 
 
-def _parse_args():
+def _parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(
         description="Convert Azure OpenAI batch output JSONL to CSV using template header."
     )
@@ -317,6 +486,12 @@ def _parse_args():
         required=False,
         help="Optional output CSV path. If omitted, replaces .jsonl with .csv.",
     )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for parsing (default: CPU count; 1 disables the pool).",
+    )
     return p.parse_args()
 
 
@@ -325,4 +500,4 @@ if __name__ == "__main__":
     batch_path = Path(args.batch_jsonl)
     template_path = Path(args.template_csv)
     out_path = Path(args.output_csv) if args.output_csv else None
-    process_batch_jsonl_to_csv(batch_path, template_path, out_path)
+    process_batch_jsonl_to_csv(batch_path, template_path, out_path, args.workers)
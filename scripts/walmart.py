@@ -18,43 +18,52 @@ Usage (CLI):
 """
 from __future__ import annotations
 
-import argparse
-import json
-from datetime import datetime, timezone
+import logging
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable, List, Dict
+from typing import TYPE_CHECKING, Any, Iterable, List, Dict, Optional
 from urllib.parse import quote_plus
 
-from config.settings import settings
-from utils.logger import get_logger
-from utils.apify_client import run_actor_and_save
+from utils.cli import (
+    build_common_argparser,
+    categories_from_args,
+    normalize_categories,
+)
+from utils.logger import get_logger, log_extra
+
+if TYPE_CHECKING:
+    import argparse
 
 logger = get_logger("walmart")
 
 
+_URL_SCHEMES = ("http://", "https://")
+
+
+@lru_cache(maxsize=4096)
 def _build_walmart_search_url(query: str) -> str:
-    """Return a Walmart search URL for a given query string."""
+    """Return a Walmart search URL for a given query string (memoized per query)."""
     q = quote_plus(query.strip())
     return f"https://www.walmart.com/search?query={q}"
 
 
-def _normalize_categories(categories: Iterable[str]) -> List[str]:
-    return [str(c).strip() for c in categories if c and str(c).strip()]
-
-
 def _categories_to_start_urls(categories: Iterable[str]) -> List[Dict[str, str]]:
     """
     Convert category strings or full URLs into startUrls list of dicts for actor input.
     If an entry already looks like a URL (starts with http/https) it is used as-is.
     """
-    out: List[Dict[str, str]] = []
-    for c in _normalize_categories(categories):
-        lc = c.lower()
-        if lc.startswith("http://") or lc.startswith("https://"):
-            out.append({"url": c})
-        else:
-            out.append({"url": _build_walmart_search_url(c)})
-    return out
+    # only the scheme prefix needs lowercasing, not the whole (possibly long) URL
+    return [
+        {
+            "url": (
+                c
+                if c[:8].lower().startswith(_URL_SCHEMES)
+                else _build_walmart_search_url(c)
+            )
+        }
+        for c in normalize_categories(categories)
+    ]
 
 
 def run(
@@ -64,7 +73,13 @@ def run(
     max_items: int = 10000,
     only_reviews: bool = False,
     proxy_use_apify: bool = True,
-) -> dict:
+    run_ts: Optional[str] = None,
+    use_cache: bool = True,
+    cache_ttl: Optional[int] = None,
+    batch_size: int = 50,
+    max_concurrency: int = 5,
+    pretty: bool = False,
+) -> List[dict]:
     """
     Start the Walmart actor with startUrls derived from categories and provided options.
 
@@ -75,103 +90,164 @@ def run(
     include_reviews:
         Whether to include reviews in the output (actor param).
     max_items:
-        Actor input 'maxItems'.
+        Actor input 'maxItems'. When the categories are split across several runs
+        (see batch_size) it is shared out in proportion to each run's startUrls.
     only_reviews:
         Whether to fetch only reviews (actor param).
     proxy_use_apify:
         Whether to use Apify proxy (proxy.useApifyProxy).
+    run_ts:
+        Optional UTC timestamp (YYYYmmddTHHMMSSZ) used in output file names, so a
+        caller dispatching several actors can share one; defaults to now.
+    use_cache:
+        Reuse a cached run for identical input (see utils.apify_client); False
+        always starts the actor.
+    cache_ttl:
+        Maximum age in seconds of a reusable cached run (defaults to
+        settings.SCRAPE_CACHE_TTL).
+    batch_size:
+        Maximum startUrls per actor run. All categories normally go into one run;
+        larger lists are split into runs of this size that execute concurrently.
+    max_concurrency:
+        Maximum number of those runs in progress at once.
+    pretty:
+        Indent the saved run metadata and dataset manifest for reading by hand;
+        compact JSON by default.
 
     Returns
     -------
-    dict
-        The run object returned by the Apify wrapper.
+    list
+        The run objects returned by the Apify wrapper, in startUrls order (a
+        single one unless the categories were split across several runs).
     """
-    cats = _normalize_categories(categories)
-    if not cats:
+    # Imported lazily so `--help` and argument errors don't pay for loading the
+    # Apify SDK, settings (.env) and asyncio.
+    import asyncio
+
+    from config.settings import settings
+    from utils.apify_client import run_actor_and_save, run_actor_and_save_async
+    from utils.io import write_json
+
+    start_urls = _categories_to_start_urls(categories)
+    if not start_urls:
         raise ValueError("No categories provided to run()")
 
-    start_urls = _categories_to_start_urls(cats)
-    logger.info(
-        "Prepared Walmart start URLs",
-        extra={"start_url_count": len(start_urls), "start_urls_sample": start_urls[:3]},
-    )
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(
+            "Prepared Walmart start URLs",
+            extra=log_extra(start_url_count=len(start_urls)),
+        )
 
-    run_input = {
-        "includeReviews": bool(include_reviews),
-        "maxItems": int(max_items),
-        "onlyReviews": bool(only_reviews),
-        "proxy": {
-            "useApifyProxy": bool(proxy_use_apify),
-            "apifyProxyGroups": ["RESIDENTIAL"],
-        },
-        "startUrls": start_urls,
-    }
+    if batch_size < 1:
+        raise ValueError("batch_size must be >= 1")
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be >= 1")
+    total = len(start_urls)
+    chunks = [start_urls[i : i + batch_size] for i in range(0, total, batch_size)]
+
+    def _run_input(chunk: List[Dict[str, str]]) -> Dict[str, Any]:
+        # the actor's maxItems covers all of a run's startUrls, so split it pro rata
+        chunk_max_items = max(1, round(int(max_items) * len(chunk) / total))
+        return {
+            "includeReviews": bool(include_reviews),
+            "maxItems": chunk_max_items,
+            "onlyReviews": bool(only_reviews),
+            "proxy": {
+                "useApifyProxy": bool(proxy_use_apify),
+                "apifyProxyGroups": ["RESIDENTIAL"],
+            },
+            "startUrls": chunk,
+        }
 
     # Prepare timestamped output paths
-    ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    ts = run_ts or time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
     out_dir = Path(settings.DATA_DIR) / "walmart"
     out_dir.mkdir(parents=True, exist_ok=True)
     run_meta_path = out_dir / f"walmart_run_{ts}.json"
 
     logger.info(
-        "Starting Walmart actor run", extra={"run_meta_path": str(run_meta_path)}
+        "Starting Walmart actor run",
+        extra=log_extra(run_meta_path=str(run_meta_path), run_count=len(chunks)),
     )
 
-    # Start actor via the shared apify wrapper. Ensure you have 'walmart' in config.ACTORS mapped to the actor ID.
-    run_obj = run_actor_and_save(actor_key="walmart", input_=run_input)
+    # Start actor via the shared apify wrapper. Ensure WALMART_ACTOR is set to the actor ID.
+    if len(chunks) == 1:
+        runs = [
+            run_actor_and_save(
+                actor_key="walmart",
+                input_=_run_input(chunks[0]),
+                use_cache=use_cache,
+                cache_ttl=cache_ttl,
+                pretty=pretty,
+            )
+        ]
+    else:
+
+        async def _run_all() -> List[Dict[str, Any]]:
+            sem = asyncio.Semaphore(max_concurrency)
+
+            async def _one(i: int, chunk: List[Dict[str, str]]) -> Dict[str, Any]:
+                async with sem:
+                    return await run_actor_and_save_async(
+                        "walmart",
+                        input_=_run_input(chunk),
+                        output_name=f"walmart_{i}",
+                        use_cache=use_cache,
+                        cache_ttl=cache_ttl,
+                        pretty=pretty,
+                    )
+
+            return list(
+                await asyncio.gather(*(_one(i, c) for i, c in enumerate(chunks)))
+            )
+
+        runs = asyncio.run(_run_all())
 
     # Save a timestamped dataset summary (best-effort)
     try:
-        dataset_id = run_obj.get("defaultDatasetId") or (run_obj.get("data") or {}).get(
-            "defaultDatasetId"
-        )
-        if dataset_id:
-            # small helper: save a manifest with dataset id
-            manifest_path = out_dir / f"walmart_dataset_{ts}.meta.json"
-            with open(manifest_path, "w", encoding="utf-8") as fh:
-                json.dump(
+        datasets = []
+        for run_obj in runs:
+            dataset_id = run_obj.get("defaultDatasetId") or (
+                run_obj.get("data") or {}
+            ).get("defaultDatasetId")
+            if dataset_id:
+                datasets.append(
                     {
                         "datasetId": dataset_id,
                         "run": run_obj.get("id") or run_obj.get("data", {}).get("id"),
-                    },
-                    fh,
-                    indent=2,
+                    }
                 )
+        if datasets:
+            # small helper: save a manifest with dataset id(s)
+            manifest_path = out_dir / f"walmart_dataset_{ts}.meta.json"
+            write_json(
+                manifest_path,
+                datasets[0] if len(runs) == 1 else {"datasets": datasets},
+                pretty=pretty,
+            )
             logger.info(
                 "Saved dataset manifest",
-                extra={"path": str(manifest_path), "dataset_id": dataset_id},
+                extra=log_extra(
+                    path=str(manifest_path),
+                    dataset_ids=[d["datasetId"] for d in datasets],
+                ),
             )
     except Exception:
-        logger.exception("Failed to save dataset manifest", extra={})
+        logger.exception("Failed to save dataset manifest")
 
     logger.info(
         "Walmart actor run finished (or started)",
-        extra={"run_id": run_obj.get("id") or (run_obj.get("data") or {}).get("id")},
+        extra=log_extra(
+            run_ids=[r.get("id") or (r.get("data") or {}).get("id") for r in runs]
+        ),
     )
 
-    return run_obj
-
-
-def _read_categories_from_file(path: str) -> List[str]:
-    p = Path(path)
-    if not p.exists():
-        raise FileNotFoundError(f"Categories file not found: {path}")
-    with p.open("r", encoding="utf-8") as fh:
-        return [ln.strip() for ln in fh if ln.strip()]
+    return runs
 
 
 def _parse_cli_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(
-        description="Run Walmart Apify actor for a list of categories or URLs."
-    )
-    group = parser.add_mutually_exclusive_group(required=True)
-    group.add_argument(
-        "--categories", help="Comma-separated categories or URLs", type=str
-    )
-    group.add_argument(
-        "--categories-file",
-        help="Path to file with one category/URL per line",
-        type=str,
+    parser = build_common_argparser(
+        "Run Walmart Apify actor for a list of categories or URLs."
     )
     parser.add_argument(
         "--max-items", type=int, default=10000, help="Max items to fetch (actor param)"
@@ -202,16 +278,42 @@ def _parse_cli_args() -> argparse.Namespace:
         help="Do not use Apify proxy",
     )
     parser.set_defaults(use_apify_proxy=True)
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Always start the actor, even if an identical run is cached",
+    )
+    parser.set_defaults(use_cache=True)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=50,
+        help="Max startUrls per actor run; more categories run concurrently in batches",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=5,
+        help="Max actor runs in progress at once when categories are batched",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=int,
+        default=None,
+        help="Max age in seconds of a reusable cached run (default: SCRAPE_CACHE_TTL)",
+    )
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Indent saved run metadata/manifest JSON (compact by default)",
+    )
     return parser.parse_args()
 
 
 if __name__ == "__main__":
     args = _parse_cli_args()
-
-    if args.categories:
-        categories_list = [c.strip() for c in args.categories.split(",") if c.strip()]
-    else:
-        categories_list = _read_categories_from_file(args.categories_file)
+    categories_list = categories_from_args(args)
 
     try:
         run(
@@ -220,8 +322,13 @@ if __name__ == "__main__":
             max_items=args.max_items,
             only_reviews=args.only_reviews,
             proxy_use_apify=args.use_apify_proxy,
+            use_cache=args.use_cache,
+            cache_ttl=args.cache_ttl,
+            batch_size=args.batch_size,
+            max_concurrency=args.max_concurrency,
+            pretty=args.pretty,
         )
         logger.info("Walmart script completed.")
     except Exception as exc:
-        logger.exception("Walmart script failed", extra={"error_msg": str(exc)})
+        logger.exception("Walmart script failed", extra=log_extra(error_msg=str(exc)))
         raise
@@ -8,18 +8,63 @@ Usage:
     from utils.apify_client import get_client, run_actor_and_save
     result = run_actor_and_save("amazon", input_=...)
 
+Several actors can run concurrently from one event loop:
+    from utils.apify_client import run_actor_and_save_async
+    runs = await asyncio.gather(
+        run_actor_and_save_async("walmart", input_=...),
+        run_actor_and_save_async("amazon", input_=...),
+    )
+
 """
 
 from __future__ import annotations
 
+import asyncio
+import gzip
+import hashlib
 import os
 import json
-from typing import Any, Dict, Iterable, Optional
+import random
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Awaitable, BinaryIO, Callable, Dict, Iterable, Optional, cast
 
-from apify_client import ApifyClient
+import orjson
+from apify_client import ApifyClient, ApifyClientAsync
 
 from config.settings import settings
-from utils.logger import get_logger
+from utils.io import ensure_dir, write_json
+from utils.logger import get_logger, log_extra
+from utils.rate_limit import get_bucket
+
+# Items requested per dataset page when downloading
+DATASET_PAGE_SIZE = 1000
+# gzip level for .gz dataset files: most of level 6's ratio on repetitive JSON
+# at a fraction of the CPU
+DATASET_GZIP_LEVEL = 3
+
+# Run statuses after which an actor run will not change any more
+TERMINAL_STATUSES = frozenset({"SUCCEEDED", "FAILED", "TIMED-OUT", "ABORTED"})
+
+
+def _open_dataset_file(output_path: str) -> BinaryIO:
+    """Open a dataset file for binary writing, gzip-compressed if it ends in .gz."""
+    if output_path.endswith(".gz"):
+        gz = gzip.open(output_path, "wb", compresslevel=DATASET_GZIP_LEVEL)
+        return cast(BinaryIO, gz)
+    return open(output_path, "wb")
+
+
+def _jsonl_line(item: Any) -> bytes:
+    """Encode one dataset item as a compact, UTF-8 JSON Lines record."""
+    try:
+        return orjson.dumps(item, option=orjson.OPT_APPEND_NEWLINE)
+    except TypeError:
+        # e.g. integers beyond 64 bits, which orjson refuses
+        line = json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+        return (line + "\n").encode("utf-8")
 
 
 class ApifySdkClient:
@@ -41,68 +86,269 @@ class ApifySdkClient:
         build: Optional[str] = None,
         wait_for_finish: Optional[bool] = None,
         wait_for_finish_timeout: Optional[int] = None,
+        poll_interval_max: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """Start (call) an actor and optionally wait for it to finish.
+        """Start an actor and optionally wait for it to finish.
 
-        Returns the run object returned by the SDK. The SDK `call` method
-        waits until the run finishes and returns the run object by default.
+        The run is started with `start()` and then polled with the API's
+        `waitForFinish` long-poll (up to `poll_interval_max` seconds per request,
+        Apify allows at most 60) until it reaches a terminal status or
+        `wait_for_finish_timeout` elapses. Returns the latest run object.
         """
         if not actor_id:
             raise ValueError("actor_id is required")
 
-        run_options: Dict[str, Any] = {}
-        if input_ is not None:
-            run_options["run_input"] = input_
-        if memory_mbytes is not None:
-            run_options["memory_mbytes"] = memory_mbytes
-        if build is not None:
-            run_options["build"] = build
-
-        # The ApifyClient.actor(actor_id).call(...) will wait by default.
-        # If the caller requested not to wait, use start() instead.
+        run = self._client.actor(actor_id).start(
+            run_input=input_, memory_mbytes=memory_mbytes, build=build
+        )
         if wait_for_finish is False:
             self.logger.info(
-                "Starting actor (non-blocking)", extra={"actor_id": actor_id}
-            )
-            run = self._client.actor(actor_id).start(
-                run_input=input_, memory_mbytes=memory_mbytes
+                "Started actor (non-blocking)",
+                extra=log_extra(actor_id=actor_id, run_id=run.get("id")),
             )
             return run
 
         timeout = wait_for_finish_timeout or settings.DEFAULT_WAIT_FOR_FINISH_TIMEOUT
+        poll_max = poll_interval_max or settings.APIFY_POLL_INTERVAL_MAX
         self.logger.info(
-            "Calling actor (blocking)", extra={"actor_id": actor_id, "timeout": timeout}
-        )
-        # call() waits for completion and returns the run object
-        run = self._client.actor(actor_id).call(
-            run_input=input_,
-            memory_mbytes=memory_mbytes,
-            wait_secs=timeout,
-            logger=self.logger,
+            "Started actor, waiting for finish",
+            extra=log_extra(actor_id=actor_id, run_id=run.get("id"), timeout=timeout),
         )
+        deadline = time.monotonic() + timeout
+        run_client = self._client.run(run["id"])
+        while run.get("status") not in TERMINAL_STATUSES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.logger.warning(
+                    "Actor run still not finished at timeout",
+                    extra=log_extra(actor_id=actor_id, run_id=run.get("id")),
+                )
+                break
+            # Server-side long-poll: returns as soon as the run finishes or after wait_secs
+            wait_secs = max(1, int(min(poll_max, remaining)))
+            run = run_client.wait_for_finish(wait_secs=wait_secs) or run
+            if run.get("status") not in TERMINAL_STATUSES:
+                # jitter so concurrent waiters don't re-poll in lockstep
+                time.sleep(random.uniform(0, 2))
+
         self.logger.debug(
-            "Actor call finished", extra={"actor_id": actor_id, "run": run}
+            "Actor run finished",
+            extra=log_extra(
+                actor_id=actor_id, run_id=run.get("id"), status=run.get("status")
+            ),
         )
-        return run  # type: ignore
+        return run
 
     def download_dataset_to_file(self, dataset_id: str, output_path: str) -> None:
-        """Download dataset as JSON array and save to a file.
+        """Stream dataset items to a JSON Lines file, one compact object per line.
+
+        The file is gzip-compressed when `output_path` ends in `.gz`.
 
-        This will stream results to avoid loading everything into memory.
+        Items are fetched in pages of DATASET_PAGE_SIZE and each page is written
+        while the next one downloads, so memory is bounded by two pages
+        regardless of dataset size.
         """
         self.logger.info(
-            "Downloading dataset", extra={"dataset_id": dataset_id, "path": output_path}
+            "Downloading dataset",
+            extra=log_extra(dataset_id=dataset_id, path=output_path),
+        )
+        ds_client = self._client.dataset(dataset_id)
+        limit = DATASET_PAGE_SIZE
+        count = 0
+        with _open_dataset_file(output_path) as fh, ThreadPoolExecutor(
+            max_workers=1
+        ) as pool:
+            page = ds_client.list_items(offset=0, limit=limit)
+            while True:
+                items = page.items
+                # fetch the next page while this one is encoded and written
+                next_page = (
+                    pool.submit(ds_client.list_items, offset=count + limit, limit=limit)
+                    if len(items) >= limit
+                    else None
+                )
+                fh.write(b"".join(map(_jsonl_line, items)))
+                count += len(items)
+                if next_page is None:
+                    break
+                page = next_page.result()
+        self.logger.info(
+            "Saved dataset to file", extra=log_extra(path=output_path, count=count)
+        )
+
+
+class AsyncApifySdkClient:
+    """asyncio counterpart of ApifySdkClient, backed by ApifyClientAsync.
+
+    The underlying HTTP client is bound to the running event loop, so create one
+    per loop rather than sharing it.
+
+    Every API request (the start call, each wait-for-finish poll, each dataset
+    page) first takes a token from the actor's bucket in utils.rate_limit; a
+    request that still fails with HTTP 429 halves that bucket's rate for a
+    minute.
+    """
+
+    def __init__(self, token: Optional[str] = None, actor_key: Optional[str] = None):
+        token = token or settings.APIFY_API_KEY
+        self._client = ApifyClientAsync(token)
+        self.logger = get_logger(actor_key or "main")
+        self._bucket = get_bucket(actor_key or "main")
+
+    async def _request(
+        self, method: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+    ) -> Any:
+        """Await `method(*args, **kwargs)` once the rate limiter allows it."""
+        await self._bucket.acquire_async()
+        try:
+            return await method(*args, **kwargs)
+        except Exception as exc:
+            if getattr(exc, "status_code", None) == 429:
+                self._bucket.throttle()
+            raise
+
+    async def call_actor(
+        self,
+        actor_id: str,
+        input_: Optional[Dict[str, Any]] = None,
+        memory_mbytes: Optional[int] = None,
+        build: Optional[str] = None,
+        wait_for_finish: Optional[bool] = None,
+        wait_for_finish_timeout: Optional[int] = None,
+        poll_interval_max: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Start an actor and optionally wait for it to finish.
+
+        Same polling behaviour as ApifySdkClient.call_actor, but waiting yields to
+        the event loop so other runs progress meanwhile.
+        """
+        if not actor_id:
+            raise ValueError("actor_id is required")
+
+        run = await self._request(
+            self._client.actor(actor_id).start,
+            run_input=input_,
+            memory_mbytes=memory_mbytes,
+            build=build,
+        )
+        if wait_for_finish is False:
+            self.logger.info(
+                "Started actor (non-blocking)",
+                extra=log_extra(actor_id=actor_id, run_id=run.get("id")),
+            )
+            return run
+
+        timeout = wait_for_finish_timeout or settings.DEFAULT_WAIT_FOR_FINISH_TIMEOUT
+        poll_max = poll_interval_max or settings.APIFY_POLL_INTERVAL_MAX
+        self.logger.info(
+            "Started actor, waiting for finish",
+            extra=log_extra(actor_id=actor_id, run_id=run.get("id"), timeout=timeout),
+        )
+        deadline = time.monotonic() + timeout
+        run_client = self._client.run(run["id"])
+        while run.get("status") not in TERMINAL_STATUSES:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.logger.warning(
+                    "Actor run still not finished at timeout",
+                    extra=log_extra(actor_id=actor_id, run_id=run.get("id")),
+                )
+                break
+            wait_secs = max(1, int(min(poll_max, remaining)))
+            run = (
+                await self._request(run_client.wait_for_finish, wait_secs=wait_secs)
+                or run
+            )
+            if run.get("status") not in TERMINAL_STATUSES:
+                await asyncio.sleep(random.uniform(0, 2))
+
+        self.logger.debug(
+            "Actor run finished",
+            extra=log_extra(
+                actor_id=actor_id, run_id=run.get("id"), status=run.get("status")
+            ),
+        )
+        return run
+
+    async def download_dataset_to_file(self, dataset_id: str, output_path: str) -> None:
+        """Stream dataset items to a JSON Lines file, paging with one-page prefetch."""
+        self.logger.info(
+            "Downloading dataset",
+            extra=log_extra(dataset_id=dataset_id, path=output_path),
         )
         ds_client = self._client.dataset(dataset_id)
-        # The SDK provides list_items, iterate_items and other helpers.
-        items = list(ds_client.iterate_items())
-        with open(output_path, "w", encoding="utf-8") as fh:
-            json.dump(items, fh, ensure_ascii=False, indent=2)
+        limit = DATASET_PAGE_SIZE
+        count = 0
+        loop = asyncio.get_running_loop()
+        next_page: Optional["asyncio.Future[Any]"] = None
+        with _open_dataset_file(output_path) as fh:
+            try:
+                page = await self._request(ds_client.list_items, offset=0, limit=limit)
+                while True:
+                    items = page.items
+                    next_page = (
+                        asyncio.ensure_future(
+                            self._request(
+                                ds_client.list_items, offset=count + limit, limit=limit
+                            )
+                        )
+                        if len(items) >= limit
+                        else None
+                    )
+                    # write off the loop so the next page downloads meanwhile
+                    data = b"".join(map(_jsonl_line, items))
+                    await loop.run_in_executor(None, fh.write, data)
+                    count += len(items)
+                    if next_page is None:
+                        break
+                    page = await next_page
+            finally:
+                # if the write failed, don't leave the prefetch running or its
+                # error unretrieved
+                if next_page is not None:
+                    if not next_page.done():
+                        next_page.cancel()
+                    elif not next_page.cancelled():
+                        next_page.exception()
         self.logger.info(
-            "Saved dataset to file", extra={"path": output_path, "count": len(items)}
+            "Saved dataset to file", extra=log_extra(path=output_path, count=count)
         )
 
 
+def _run_cache_path(actor_key: str, input_: Optional[Dict[str, Any]]) -> str:
+    """Path of the run-cache entry for this actor and (canonicalized) input."""
+    canonical = json.dumps(
+        {"a": actor_key, "i": input_}, sort_keys=True, separators=(",", ":")
+    )
+    key = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    return os.path.join(settings.DATA_DIR, "_cache", f"{key}.json")
+
+
+def _load_cached_run(cache_path: str, ttl: int) -> Optional[Dict[str, Any]]:
+    """Return the cache entry if it is younger than `ttl` seconds and its dataset still exists."""
+    try:
+        if time.time() - os.path.getmtime(cache_path) > ttl:
+            return None
+        with open(cache_path, "r", encoding="utf-8") as fh:
+            entry = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if not os.path.exists(entry.get("dataset_path") or ""):
+        return None
+    return entry
+
+
+def _save_cached_run(cache_path: str, run: Dict[str, Any], dataset_path: str) -> None:
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, "w", encoding="utf-8") as fh:
+            # run objects from the SDK carry datetimes
+            json.dump({"run": run, "dataset_path": dataset_path}, fh, default=str)
+    except OSError:
+        # Caching is best-effort; the run itself already succeeded
+        pass
+
+
 # Singleton client
 _client: Optional[ApifySdkClient] = None
 
@@ -114,61 +360,117 @@ def get_client(actor_key: Optional[str] = None) -> ApifySdkClient:
     return _client
 
 
-def run_actor_and_save(
+async def run_actor_and_save_async(
     actor_key: str,
     input_: Optional[Dict[str, Any]] = None,
+    output_name: Optional[str] = None,
+    poll_interval_max: Optional[int] = None,
+    use_cache: bool = True,
+    cache_ttl: Optional[int] = None,
+    pretty: bool = False,
 ) -> Dict[str, Any]:
-    """Start actor by actor_key (one of 'amazon','etsy','shopify','ebay') as defined
-    in config.ACTORS and optionally save the run object and dataset results to a file.
+    """Start actor by actor_key (e.g. 'amazon', 'etsy', 'ebay'), resolved to the
+    actor ID in the <ACTOR_KEY>_ACTOR env var, and optionally save the run object and dataset results to a file.
 
-    Returns the run object. If the run produced a default dataset and `output_path`
-    ends with `.json`, the dataset will be saved there.
-    """
-    from config.settings import settings
+    Files are written under data/<actor_key>/ using `output_name` as the file stem
+    (defaults to actor_key); give concurrent runs of one actor distinct names.
+    `poll_interval_max` caps each waitForFinish poll (defaults to
+    settings.APIFY_POLL_INTERVAL_MAX).
+
+    Returns the run object. If the run produced a default dataset, its items are
+    streamed to data/<actor_key>/raw/<stem>.dataset.jsonl.gz (gzipped JSON Lines).
 
-    actor_id = settings.ACTORS.get(actor_key)
+    Successful runs are cached under data/_cache/ keyed by sha256 of the actor key
+    and input. A repeat call with the same input within `cache_ttl` seconds
+    (defaults to settings.SCRAPE_CACHE_TTL; 0 disables) returns the cached run
+    and reuses its downloaded dataset instead of starting the actor again.
+    `use_cache=False` skips the lookup but still refreshes the entry.
+
+    The run object is saved as compact JSON; pass `pretty=True` to indent it.
+    """
+    actor_id = settings.actor_for(actor_key)
     if not actor_id:
         raise ValueError(f"Actor id for key '{actor_key}' not configured")
 
-    client = get_client(actor_key)
     logger = get_logger(actor_key)
+    stem = output_name or actor_key
+    # data/<actor_key>/raw/ (and its parent) created once per process
+    actor_dir = Path(settings.DATA_DIR) / actor_key
+    dataset_path = str(ensure_dir(actor_dir / "raw") / f"{stem}.dataset.jsonl.gz")
 
-    run = client.call_actor(
+    ttl = settings.SCRAPE_CACHE_TTL if cache_ttl is None else cache_ttl
+    cache_path = _run_cache_path(actor_key, input_)
+    cached = _load_cached_run(cache_path, ttl) if use_cache and ttl > 0 else None
+    if cached is not None:
+        if os.path.abspath(cached["dataset_path"]) != os.path.abspath(dataset_path):
+            shutil.copyfile(cached["dataset_path"], dataset_path)
+        logger.info(
+            "Reusing cached actor run",
+            extra=log_extra(cache_path=cache_path, dataset_path=dataset_path),
+        )
+        return cached["run"]
+
+    client = AsyncApifySdkClient(actor_key=actor_key)
+    run = await client.call_actor(
         actor_id=actor_id,
         input_=input_,
         memory_mbytes=settings.DEFAULT_MEMORY_MBYTES,
         wait_for_finish=settings.DEFAULT_WAIT_FOR_FINISH,
         wait_for_finish_timeout=settings.DEFAULT_WAIT_FOR_FINISH_TIMEOUT,
+        poll_interval_max=poll_interval_max,
     )
 
     # Save run metadata
-    output_path = os.path.join(settings.DATA_DIR, actor_key, f"{actor_key}.json")
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    output_path = str(actor_dir / f"{stem}.json")
     try:
-        with open(output_path, "w", encoding="utf-8") as fh:
-            json.dump(str(run), fh, ensure_ascii=False, indent=2)
-        logger.info("Saved actor run metadata", extra={"path": output_path})
+        write_json(output_path, run, pretty=pretty)
+        logger.info("Saved actor run metadata", extra=log_extra(path=output_path))
     except Exception:
         logger.exception(
-            "Failed to save actor run metadata", extra={"path": output_path}
+            "Failed to save actor run metadata", extra=log_extra(path=output_path)
         )
 
     # If run contains a dataset id, download dataset
     dataset_id = run.get("defaultDatasetId") or (run.get("data") or {}).get(
         "defaultDatasetId"
     )
-    if dataset_id and output_path and output_path.endswith(".json"):
-        # Prefer saving dataset in a sibling file with suffix
-        dataset_path = os.path.join(
-            settings.DATA_DIR, actor_key, "raw", f"{actor_key}.dataset.json"
-        )
-        os.makedirs(os.path.dirname(dataset_path), exist_ok=True)
+    if dataset_id:
         try:
-            client.download_dataset_to_file(dataset_id, dataset_path)
+            await client.download_dataset_to_file(dataset_id, dataset_path)
         except Exception:
             logger.exception(
                 "Failed to download dataset",
-                extra={"dataset_id": dataset_id, "path": dataset_path},
+                extra=log_extra(dataset_id=dataset_id, path=dataset_path),
             )
+        else:
+            if ttl > 0 and run.get("status") == "SUCCEEDED":
+                _save_cached_run(cache_path, run, dataset_path)
 
     return run
+
+
+def run_actor_and_save(
+    actor_key: str,
+    input_: Optional[Dict[str, Any]] = None,
+    output_name: Optional[str] = None,
+    poll_interval_max: Optional[int] = None,
+    use_cache: bool = True,
+    cache_ttl: Optional[int] = None,
+    pretty: bool = False,
+) -> Dict[str, Any]:
+    """Blocking wrapper around run_actor_and_save_async for the CLI scripts.
+
+    Runs its own event loop, so call it from synchronous code (or a worker
+    thread), not from inside a running loop.
+    """
+    return asyncio.run(
+        run_actor_and_save_async(
+            actor_key,
+            input_=input_,
+            output_name=output_name,
+            poll_interval_max=poll_interval_max,
+            use_cache=use_cache,
+            cache_ttl=cache_ttl,
+            pretty=pretty,
+        )
+    )
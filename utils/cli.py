@@ -0,0 +1,68 @@
+"""
+utils/cli.py
+
+Command-line helpers shared by the standalone scraper scripts.
+
+Example:
+    from utils.cli import build_common_argparser, categories_from_args
+
+    parser = build_common_argparser("Run eBay Apify actor for a list of categories.")
+    parser.add_argument("--max-items", type=int, default=10)
+    args = parser.parse_args()
+    categories = categories_from_args(args)
+
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Union
+
+from utils.io import read_nonempty_lines
+
+if TYPE_CHECKING:
+    import argparse
+
+
+def read_categories_from_file(path: Union[str, Path]) -> List[str]:
+    """Return the non-empty, stripped lines of a categories file."""
+    p = Path(path)
+    if not p.exists():
+        raise FileNotFoundError(f"Categories file not found: {p}")
+    return read_nonempty_lines(p)
+
+
+def normalize_categories(categories: Iterable[str]) -> Iterator[str]:
+    """Yield stripped, non-empty category strings without building a list."""
+    for c in categories:
+        s = str(c).strip() if c else ""
+        if s:
+            yield s
+
+
+def build_common_argparser(
+    description: str,
+    *,
+    categories_help: str = "Comma-separated categories or URLs",
+    categories_file_help: str = "Path to file with one category/URL per line",
+) -> argparse.ArgumentParser:
+    """Return an ArgumentParser with the required --categories / --categories-file group.
+
+    Scrapers add their own actor-specific options on top of the returned parser.
+    """
+    # argparse (and the gettext/textwrap it pulls in) is only needed when a script
+    # is run from the command line, not when its run() is imported.
+    import argparse
+
+    parser = argparse.ArgumentParser(description=description)
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--categories", help=categories_help, type=str)
+    group.add_argument("--categories-file", help=categories_file_help, type=str)
+    return parser
+
+
+def categories_from_args(args: argparse.Namespace) -> List[str]:
+    """Resolve the category list from parsed --categories / --categories-file args."""
+    if args.categories:
+        return [c.strip() for c in args.categories.split(",") if c.strip()]
+    return read_categories_from_file(args.categories_file)
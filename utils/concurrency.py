@@ -0,0 +1,41 @@
+"""
+utils/concurrency.py
+
+Helpers for running several blocking actor runs concurrently.
+
+Example:
+    import asyncio
+    from functools import partial
+    from utils.concurrency import gather_blocking
+
+    results = asyncio.run(
+        gather_blocking([partial(run, ["mugs"]), partial(run, ["lamps"])], max_concurrency=2)
+    )
+
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Callable, Iterable, List, TypeVar
+
+T = TypeVar("T")
+
+
+async def gather_blocking(
+    calls: Iterable[Callable[[], T]], *, max_concurrency: int = 5
+) -> List[T]:
+    """Run blocking zero-argument callables in the default executor.
+
+    At most `max_concurrency` run at once; results are returned in input order.
+    """
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be >= 1")
+    sem = asyncio.Semaphore(max_concurrency)
+    loop = asyncio.get_running_loop()
+
+    async def _one(call: Callable[[], T]) -> T:
+        async with sem:
+            return await loop.run_in_executor(None, call)
+
+    return list(await asyncio.gather(*(_one(c) for c in calls)))
@@ -0,0 +1,60 @@
+"""
+utils/io.py
+
+Small file helpers shared by the scraper CLIs.
+
+Example:
+    from utils.io import read_nonempty_lines, write_json
+    categories = read_nonempty_lines("categories.txt")
+    write_json("data/walmart/manifest.json", {"datasetId": "abc"})
+
+"""
+
+from __future__ import annotations
+
+import gzip
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, List, Union
+
+# Read buffer for category files; large enough that a typical file is one read().
+READ_BUFFER_SIZE = 1 << 16
+# Write buffer for JSON output files
+WRITE_BUFFER_SIZE = 1 << 16
+
+
+@lru_cache(maxsize=None)
+def ensure_dir(path: Path) -> Path:
+    """Create `path` (and parents) the first time it is requested; return it."""
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def read_nonempty_lines(path: Union[str, Path]) -> List[str]:
+    """Return the stripped, non-empty lines of a text file.
+
+    Files ending in `.gz` are decompressed transparently.
+    """
+    p = Path(path)
+    if p.suffix.lower() == ".gz":
+        fh = gzip.open(p, "rt", encoding="utf-8")
+    else:
+        fh = p.open("r", encoding="utf-8", buffering=READ_BUFFER_SIZE)
+    with fh:
+        # one read, then split/strip/filter in C rather than a per-line Python loop
+        return list(filter(None, map(str.strip, fh.read().splitlines())))
+
+
+def write_json(path: Union[str, Path], obj: Any, *, pretty: bool = False) -> None:
+    """Write `obj` as UTF-8 JSON: compact by default, 2-space indented if `pretty`.
+
+    Values JSON has no type for (e.g. datetimes in SDK run objects) are written
+    as ISO strings or str().
+    """
+    # only the writers need orjson; keep it out of the CLIs' startup path
+    import orjson
+
+    option = orjson.OPT_INDENT_2 if pretty else 0
+    data = orjson.dumps(obj, default=str, option=option | orjson.OPT_NON_STR_KEYS)
+    with open(path, "wb", buffering=WRITE_BUFFER_SIZE) as fh:
+        fh.write(data)
@@ -6,6 +6,10 @@ Provides `get_logger()` which returns a configured `logging.Logger` instance
 with file rotation (size-based or time-based), optional console output,
 and an optional simple JSON formatter.
 
+Log calls only enqueue the record; a background QueueListener thread per logger
+formats it and writes to the file/console handlers, so rotation and disk writes
+never block the caller.
+
 Example:
     from utils.logger import get_logger
     logger = get_logger("amazon", log_file="logs/amazon.log", rotation="size")
@@ -15,19 +19,58 @@ Example:
 
 from __future__ import annotations
 
+import atexit
 import json
 import logging
 import logging.handlers
+import os
+import queue
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+
+# Standard LogRecord attributes; anything else on a record came from `extra=`
+_RESERVED_LOG_ATTRS = frozenset(
+    {
+        "name",
+        "msg",
+        "args",
+        "levelname",
+        "levelno",
+        "pathname",
+        "filename",
+        "module",
+        "exc_info",
+        "exc_text",
+        "stack_info",
+        "lineno",
+        "funcName",
+        "created",
+        "msecs",
+        "relativeCreated",
+        "thread",
+        "threadName",
+        "processName",
+        "process",
+        "taskName",
+        "message",
+        "asctime",
+    }
+)
 
 
 class JsonFormatter(logging.Formatter):
     """Simple JSON formatter for logs.
 
     Produces one-line JSON objects with timestamp, level, logger name and message.
+    Timestamps are UTC.
     """
 
+    converter = time.gmtime
+
     def format(
         self, record: logging.LogRecord
     ) -> str:  # pragma: no cover - small helper
@@ -42,35 +85,183 @@ class JsonFormatter(logging.Formatter):
             record_dict["exc_info"] = self.formatException(record.exc_info)
         # Include any extra attributes
         extras = {
-            k: v
-            for k, v in record.__dict__.items()
-            if k
-            not in (
-                "name",
-                "msg",
-                "args",
-                "levelname",
-                "levelno",
-                "pathname",
-                "filename",
-                "module",
-                "exc_info",
-                "exc_text",
-                "stack_info",
-                "lineno",
-                "funcName",
-                "created",
-                "msecs",
-                "relativeCreated",
-                "thread",
-                "threadName",
-                "processName",
-                "process",
-            )
+            k: v for k, v in record.__dict__.items() if k not in _RESERVED_LOG_ATTRS
         }
         if extras:
             record_dict["extra"] = extras  # type: ignore
-        return json.dumps(record_dict, default=str)
+        try:
+            return orjson.dumps(
+                record_dict, default=str, option=orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except TypeError:
+            # e.g. integers beyond 64 bits, which orjson refuses
+            return json.dumps(record_dict, default=str)
+
+
+class _BatchedFlushMixin:
+    """Flush a file handler every `flush_every` records instead of after each one.
+
+    Records at WARNING or above flush immediately (along with anything pending),
+    as do close() and rollover, so only routine INFO/DEBUG output can lag.
+    """
+
+    flush_every = 128
+    _buffering = False
+    _unflushed = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._buffering = record.levelno < logging.WARNING
+        try:
+            super().emit(record)  # type: ignore[misc]
+        finally:
+            self._buffering = False
+
+    def flush(self) -> None:
+        if self._buffering:
+            self._unflushed += 1
+            if self._unflushed < self.flush_every:
+                return
+        self._unflushed = 0
+        super().flush()  # type: ignore[misc]
+
+
+class _BufferedRotatingFileHandler(
+    _BatchedFlushMixin, logging.handlers.RotatingFileHandler
+):
+    """Size-rotating handler that tracks the file size itself.
+
+    The stock shouldRollover() calls stream.tell() on every record, which
+    flushes the buffer and would defeat the batched flushing.
+    """
+
+    _size: Optional[int] = None
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.maxBytes <= 0:
+            return False
+        if self.stream is None:  # delay=True: first record opens the file
+            self.stream = self._open()
+        if self._size is None:
+            self._size = self.stream.seek(0, 2)
+        size = len(("%s\n" % self.format(record)).encode("utf-8", "replace"))
+        if self._size + size >= self.maxBytes:
+            return True
+        # not rolling over, so the record is about to be written
+        self._size += size
+        return False
+
+    def doRollover(self) -> None:
+        super().doRollover()
+        self._size = None
+
+
+class _BufferedTimedRotatingFileHandler(
+    _BatchedFlushMixin, logging.handlers.TimedRotatingFileHandler
+):
+    pass
+
+
+class _UtcFormatter(logging.Formatter):
+    """Human-readable formatter with UTC timestamps (no per-record localtime())."""
+
+    converter = time.gmtime
+
+
+# Loggers configured by get_logger, keyed by its full argument tuple
+_LOGGERS: Dict[Tuple[Any, ...], logging.Logger] = {}
+
+# Set once any logger is configured with the JSON formatter, the only one that
+# renders `extra` fields
+_JSON_ENABLED = False
+
+
+def log_extra(**fields: Any) -> Dict[str, Any]:
+    """Return `fields` for a log call's `extra=`, or {} when no JSON logging is on.
+
+    The human-readable formatter ignores extra fields, so this skips attaching
+    them to every LogRecord unless a JSON-formatted logger exists.
+    """
+    return fields if _JSON_ENABLED else {}
+
+
+# Background listeners owning each logger's real handlers, keyed by logger name
+_LISTENERS: Dict[str, logging.handlers.QueueListener] = {}
+
+
+class _InProcessQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that enqueues records as-is.
+
+    The queue never leaves the process, so the record need not be made
+    pickle-safe; message formatting is left to the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _stop_listener(name: str) -> None:
+    """Flush and stop `name`'s listener, then close the handlers it owned."""
+    listener = _LISTENERS.pop(name, None)
+    if listener is not None:
+        listener.stop()
+        for h in listener.handlers:
+            h.close()
+
+
+@atexit.register
+def _stop_listeners() -> None:
+    for name in list(_LISTENERS):
+        _stop_listener(name)
+
+
+def _listener_handlers() -> List[logging.Handler]:
+    return [h for listener in _LISTENERS.values() for h in listener.handlers]
+
+
+def _lock_handlers_before_fork() -> None:
+    # Holding every handler's lock across fork() means no listener thread is
+    # mid-emit (or mid-rollover) when the process is copied, so the child never
+    # inherits a stream whose internal lock is held by a thread it doesn't have.
+    # Flushing under the lock empties the batched write buffers first, so the
+    # child doesn't get a copy of the parent's pending records and write them
+    # out a second time.
+    for h in _listener_handlers():
+        h.acquire()
+        h.flush()
+
+
+def _unlock_handlers_after_fork() -> None:
+    for h in _listener_handlers():
+        try:
+            h.release()
+        except RuntimeError:
+            # logging's own at-fork hook already gave the child fresh locks
+            pass
+
+
+def _reattach_handlers_in_child() -> None:
+    # A forked child (e.g. a process-pool worker) inherits the QueueHandlers but
+    # not the listener threads, and exits without running atexit; log from it
+    # synchronously through the real handlers instead, flushing every record.
+    _unlock_handlers_after_fork()
+    for name, listener in _LISTENERS.items():
+        logger = logging.getLogger(name)
+        for h in list(logger.handlers):
+            if isinstance(h, logging.handlers.QueueHandler):
+                logger.removeHandler(h)
+        for h in listener.handlers:
+            if isinstance(h, _BatchedFlushMixin):
+                h.flush_every = 1
+            logger.addHandler(h)
+    _LISTENERS.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(
+        before=_lock_handlers_before_fork,
+        after_in_parent=_unlock_handlers_after_fork,
+        after_in_child=_reattach_handlers_in_child,
+    )
 
 
 def get_logger(
@@ -85,7 +276,7 @@ def get_logger(
     console: bool = True,
     use_json: bool = False,
     fmt: Optional[str] = None,
-    datefmt: str = "%Y-%m-%d %H:%M:%S",
+    datefmt: str = "%Y-%m-%d %H:%M:%SZ",
 ) -> logging.Logger:
     """Return a configured logger.
 
@@ -114,20 +305,44 @@ def get_logger(
     fmt: Optional[str]
         Format string for human-readable logs. Defaults to "%(asctime)s - %(name)s - %(levelname)s - %(message)s".
     datefmt: str
-        Date format used in logs.
+        Date format used in logs. Timestamps are always UTC (hence the trailing Z
+        in the default), matching the UTC run timestamps in output file names.
 
     Returns
     -------
     logging.Logger
         Configured logger instance.
+
+    Repeat calls with the same arguments return the already configured logger
+    without touching its handlers; calling again with different arguments
+    reconfigures it.
     """
+    key = (
+        name,
+        log_file,
+        level,
+        rotation,
+        max_bytes,
+        backup_count,
+        when,
+        interval,
+        console,
+        use_json,
+        fmt,
+        datefmt,
+    )
+    cached = _LOGGERS.get(key)
+    if cached is not None:
+        return cached
 
     logger = logging.getLogger(name)
     logger.setLevel(level)
 
-    # Remove all existing handlers so reconfiguring works predictably
+    # Remove (and close) all existing handlers so reconfiguring works predictably
     for h in list(logger.handlers):
         logger.removeHandler(h)
+        h.close()
+    _stop_listener(name)
 
     # Ensure logs directory
     if not log_file:
@@ -140,40 +355,58 @@ def get_logger(
 
     # Choose formatter
     if use_json:
+        global _JSON_ENABLED
+        _JSON_ENABLED = True
         formatter = JsonFormatter(datefmt=datefmt)
     else:
         human_fmt = fmt or "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        formatter = logging.Formatter(human_fmt, datefmt=datefmt)
+        formatter = _UtcFormatter(human_fmt, datefmt=datefmt)
 
-    # File handler with rotation
+    # File handler with rotation; the file is opened on the first record and
+    # flushed in batches (see _BatchedFlushMixin)
     if rotation == "time":
-        file_handler = logging.handlers.TimedRotatingFileHandler(
+        file_handler = _BufferedTimedRotatingFileHandler(
             filename=log_file,
             when=when,
             interval=interval,
             backupCount=backup_count,
-            utc=False,
+            utc=True,
+            delay=True,
         )
     else:
         # default to size-based rotation
-        file_handler = logging.handlers.RotatingFileHandler(
+        file_handler = _BufferedRotatingFileHandler(
             filename=log_file,
             maxBytes=max_bytes,
             backupCount=backup_count,
+            delay=True,
         )
 
     file_handler.setLevel(level)
     file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+    handlers: List[logging.Handler] = [file_handler]
 
     # Optional console handler
     if console:
         stream_handler = logging.StreamHandler()
         stream_handler.setLevel(level)
         stream_handler.setFormatter(formatter)
-        logger.addHandler(stream_handler)
+        handlers.append(stream_handler)
+
+    # The logger itself only enqueues; the listener thread formats and writes
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    logger.addHandler(_InProcessQueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    _LISTENERS[name] = listener
 
     # Propagate False so logs don't get duplicated by root logger
     logger.propagate = False
 
+    # A reconfigured logger invalidates any entry cached under its old arguments
+    for k in [k for k, v in _LOGGERS.items() if v is logger]:
+        del _LOGGERS[k]
+    _LOGGERS[key] = logger
     return logger
@@ -19,7 +19,8 @@ Usage (quick):
     --batch-size 50
 
 Environment variables supported (will be used when CLI args omitted):
-  AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_KEY, AZURE_OPENAI_DEPLOYMENT, AZURE_API_VERSION
+  AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_KEY, AZURE_OPENAI_DEPLOYMENT, AZURE_API_VERSION,
+  AZURE_OPENAI_RPM, AZURE_OPENAI_TPM
 
 Notes:
  - The script expects raw JSON files to contain either a JSON array of objects
@@ -31,55 +32,268 @@ Notes:
 from __future__ import annotations
 
 import argparse
+import asyncio
 import csv
+import gzip
+import hashlib
 import json
 import os
-import sys
+import re
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
+from functools import lru_cache
+from html.parser import HTMLParser
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Container,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 from urllib.parse import urlparse
 
+import ijson
+import orjson
 from dotenv import load_dotenv
-import json
-from openai import AzureOpenAI
+from openai import APIConnectionError, AsyncAzureOpenAI, AzureOpenAI
 from openai.types.chat.chat_completion_message_param import ChatCompletionMessageParam
-from utils.prompt import PROMPT_INSTRUCTION
+from utils.prompt import (
+    CSV_HEADER_SET,
+    example_platform,
+    platform_name,
+    render_batch_prompt,
+    render_prompt,
+    render_prompt_bytes,
+    split_prompt,
+)
 from utils.logger import get_logger
+from utils.rate_limit import TokenBucket
 
 logger = get_logger("normalize")
 
 # -------------------------
 # Deterministic helpers
 # -------------------------
-def safe_load_json_file(path: Path) -> List[Dict[str, Any]]:
-    """Load JSON objects from a file. Accepts a JSON array or JSONL file."""
-    text = path.read_text(encoding="utf-8")
-    try:
-        data = json.loads(text)
-        if isinstance(data, list):
-            return data
-        if isinstance(data, dict):
-            # single object - return as list
-            return [data]
-    except json.JSONDecodeError:
-        # Try JSON lines
-        objs = []
-        for ln in text.splitlines():
+# Compiled once for the priceWithCurrency parse in extract_deterministic_fields
+_NUM_RE = re.compile(r"[-+]?[0-9]{1,3}(?:[0-9,]*)(?:\.[0-9]+)?")
+_ISO_RE = re.compile(r"\b([A-Z]{3})\b")
+_SYM_RE = re.compile(r"([$€£¥])")
+_SYMBOL_MAP = {"$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY"}
+
+
+def _first_json_byte(fh: BinaryIO) -> bytes:
+    """Return the first non-whitespace byte of `fh` (b"" if none) and rewind it."""
+    first = b""
+    while True:
+        chunk = fh.read(4096)
+        if not chunk:
+            break
+        chunk = chunk.lstrip()
+        if chunk:
+            first = chunk[:1]
+            break
+    fh.seek(0)
+    return first
+
+
+def safe_load_json_file(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield JSON objects from a JSON array or JSONL file (optionally .gz).
+
+    The file is streamed rather than read whole: arrays are walked item by item
+    with ijson and JSONL is parsed one line at a time, skipping invalid lines. A
+    file holding one (possibly pretty-printed) JSON object is loaded in full.
+    """
+    opener = gzip.open if path.suffix.lower() == ".gz" else open
+    with opener(path, "rb") as fh:
+        first = _first_json_byte(fh)
+        if first == b"[":
+            yield from ijson.items(fh, "item", use_float=True)
+            return
+        if not first:
+            return
+
+        # JSONL unless the first line isn't JSON on its own (a multi-line object)
+        head = fh.readline().strip()
+        fh.seek(0)
+        try:
+            orjson.loads(head)
+        except orjson.JSONDecodeError:
+            try:
+                data = orjson.loads(fh.read())
+            except orjson.JSONDecodeError:
+                fh.seek(0)  # broken first line; keep what JSONL we can
+            else:
+                if isinstance(data, dict):
+                    yield data
+                return
+
+        for ln in fh:
             ln = ln.strip()
             if not ln:
                 continue
             try:
-                objs.append(json.loads(ln))
-            except Exception as e:
+                yield orjson.loads(ln)
+            except orjson.JSONDecodeError as e:
                 logger.warning(
                     "Skipping invalid JSON line",
-                    extra={"file": str(path), "line": ln[:200], "error": str(e)},
+                    extra={
+                        "file": str(path),
+                        "line": ln[:200].decode("utf-8", "replace"),
+                        "error": str(e),
+                    },
                 )
-        return objs
-    return []
+
+
+# Deterministic fields in output order, each with the raw keys it is copied
+# from: the first truthy one wins. Fields without keys are computed below.
+_DET_FIELDS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("url", ("url", "link", "product_url", "itemUrl")),
+    ("source", ("source", "site")),  # replaced by the URL's domain when known
+    ("title", ("title", "name")),
+    ("price", ()),
+    ("currency", ()),
+    (
+        "image_urls",
+        ("images", "image", "image_urls", "photos", "additionalPhotosArray"),
+    ),
+    ("upc", ("upc", "ean")),
+    ("mpn", ("mpn",)),
+    ("seller_name", ("seller", "sellerName")),
+    ("itemLocation", ("itemLocation", "location")),
+    ("supplier_url", ("supplierWebsite",)),
+    ("category", ("categories", "category")),
+    ("rating", ("rating", "averageRating")),
+    ("review_count", ("review_count", "reviews")),
+    ("description", ("description", "subTitle", "details")),
+    ("date", ("uploadDate", "listedOn", "lastUpdated")),  # as YYYY-MM-DD
+)
+
+# Non-ISO date layouts seen in scraped listings, tried after fromisoformat()
+_DATE_FORMATS = (
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+    "%d %b %Y",
+    "%d %B %Y",
+)
+
+
+def _epoch_date(ts: float) -> Optional[str]:
+    # seconds, or milliseconds when too large to be a plausible seconds value
+    if ts > 1e11:
+        ts /= 1000
+    try:
+        return datetime.fromtimestamp(ts, timezone.utc).date().isoformat()
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _parse_date_str(value: str) -> Optional[str]:
+    # records from one scrape share a handful of dates, hence the cache
+    value = value.strip()
+    if value.isdigit():
+        return _epoch_date(int(value))
+    try:
+        return datetime.fromisoformat(value).date().isoformat()
+    except ValueError:
+        pass
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def iso_date(value: Any) -> Optional[str]:
+    """Return `value` (ISO string, common date layout or epoch) as YYYY-MM-DD."""
+    if isinstance(value, str):
+        return _parse_date_str(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return _epoch_date(value)
+    return None
+
+
+# Descriptions are often scraped as HTML; only text that looks like markup is parsed
+_HTML_TAG_RE = re.compile(r"<[a-zA-Z/!]")
+_WS_RE = re.compile(r"[ \t\r\f\v\xa0]+")
+_BLANK_LINES_RE = re.compile(r"\s*\n\s*")
+
+
+class _TextExtractor(HTMLParser):
+    """Collect the text of an HTML fragment (entities decoded, scripts dropped)."""
+
+    _BLOCK_TAGS = frozenset(
+        {"p", "div", "br", "li", "ul", "ol", "tr", "table", "h1", "h2", "h3", "h4"}
+    )
+    _SKIP_TAGS = frozenset({"script", "style"})
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skipping = 0
+
+    def handle_starttag(self, tag: str, attrs: Any) -> None:
+        if tag in self._SKIP_TAGS:
+            self._skipping += 1
+        elif tag in self._BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._SKIP_TAGS:
+            self._skipping = max(0, self._skipping - 1)
+        elif tag in self._BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if not self._skipping:
+            self.parts.append(data)
+
+
+def html_to_text(value: str) -> str:
+    """Return `value` with HTML tags removed and whitespace collapsed."""
+    if not _HTML_TAG_RE.search(value):
+        return value
+    parser = _TextExtractor()
+    parser.feed(value)
+    parser.close()
+    text = _WS_RE.sub(" ", "".join(parser.parts))
+    return _BLANK_LINES_RE.sub("\n", text).strip()
+
+
+def _compile_alias_extractor(
+    fields: Tuple[Tuple[str, Tuple[str, ...]], ...],
+) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Generate `_extract(record)` returning {field: first truthy alias or None}.
+
+    The spec is fixed, so the lookups are rendered as one straight-line dict
+    literal (`g("url") or g("link") or ... or None`) and compiled once, instead
+    of being re-resolved for every record.
+    """
+    items = []
+    for field, keys in fields:
+        expr = " or ".join([f"g({k!r})" for k in keys] + ["None"])
+        items.append(f"        {field!r}: {expr},")
+    src = "\n".join(
+        ["def _extract(record):", "    g = record.get", "    return {", *items, "    }"]
+    )
+    namespace: Dict[str, Any] = {}
+    exec(compile(src, "<normalize._DET_FIELDS>", "exec"), namespace)
+    return namespace["_extract"]
+
+
+_extract_aliases = _compile_alias_extractor(_DET_FIELDS)
+_DET_FIELD_NAMES = frozenset(field for field, _ in _DET_FIELDS)
 
 
 def extract_deterministic_fields(record: Dict[str, Any]) -> Dict[str, Any]:
@@ -88,29 +302,22 @@ def extract_deterministic_fields(record: Dict[str, Any]) -> Dict[str, Any]:
     - price (numeric) and currency (ISO-ish if available)
     - images list
     - upc/ean/mpn
-    - seller_name, itemLocation
+    - seller_name, itemLocation, supplier_url
     - domain / source
+    - upload/listing date as YYYY-MM-DD
+    - description as plain text (HTML stripped)
+    Every field in _DET_FIELDS is present in the result (None when unknown).
     """
-    out: Dict[str, Any] = {}
+    # Plain alias lookups (url, title, upc, seller, ...) in one generated call
+    out = _extract_aliases(record)
 
     # Source/domain
-    url = (
-        record.get("url")
-        or record.get("link")
-        or record.get("product_url")
-        or record.get("itemUrl")
-    )
-    out["url"] = url
+    url = out["url"]
     if url:
         try:
             out["source"] = urlparse(str(url)).netloc
         except Exception:
             out["source"] = None
-    else:
-        out["source"] = record.get("source") or record.get("site") or None
-
-    # Title
-    out["title"] = record.get("title") or record.get("name") or None
 
     # Price extraction: prefer numeric 'price' else parse priceWithCurrency
     price = record.get("price")
@@ -121,27 +328,22 @@ def extract_deterministic_fields(record: Dict[str, Any]) -> Dict[str, Any]:
         if isinstance(pwc, str) and pwc.strip():
             # look for currency code or symbol and number
             # e.g., "US $24.95/ea" or "€12.00"
-            import re
-
-            num_match = re.search(
-                r"[-+]?[0-9]{1,3}(?:[0-9,]*)(?:\.[0-9]+)?", pwc.replace(",", "")
-            )
+            pwc_clean = pwc.replace(",", "")
+            num_match = _NUM_RE.search(pwc_clean)
             if num_match:
                 try:
                     out["price"] = float(num_match.group(0))
                 except Exception:
                     out["price"] = None
             # try to detect currency ISO or symbol
-            cur_match = re.search(r"\b([A-Z]{3})\b", pwc)
+            cur_match = _ISO_RE.search(pwc)
             if cur_match:
                 currency = cur_match.group(1)
             else:
-                sym_match = re.search(r"([$€£¥])", pwc)
+                sym_match = _SYM_RE.search(pwc)
                 if sym_match:
-                    sym = sym_match.group(1)
                     # map symbol to common code
-                    symbol_map = {"$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY"}
-                    currency = symbol_map.get(sym)
+                    currency = _SYMBOL_MAP.get(sym_match.group(1))
     else:
         # numeric price present
         try:
@@ -155,12 +357,7 @@ def extract_deterministic_fields(record: Dict[str, Any]) -> Dict[str, Any]:
     out["currency"] = currency or None
 
     # Images
-    imgs = (
-        record.get("images")
-        or record.get("image")
-        or record.get("image_urls")
-        or record.get("photos")
-    )
+    imgs = out["image_urls"]
     if isinstance(imgs, (list, tuple)):
         out["image_urls"] = list(imgs)
     elif isinstance(imgs, str):
@@ -168,45 +365,433 @@ def extract_deterministic_fields(record: Dict[str, Any]) -> Dict[str, Any]:
     else:
         out["image_urls"] = []
 
-    # Identifiers
-    out["upc"] = record.get("upc") or record.get("ean") or None
-    out["mpn"] = record.get("mpn") or None
-
-    # Seller info
-    out["seller_name"] = record.get("seller") or record.get("sellerName") or None
-    out["itemLocation"] = record.get("itemLocation") or record.get("location") or None
-
     # Category (best-effort)
-    cats = record.get("categories") or record.get("category") or None
+    cats = out["category"]
     if isinstance(cats, list):
         out["category"] = cats[0] if cats else None
-    else:
-        out["category"] = cats
 
-    # rating/reviews
-    out["rating"] = record.get("rating") or record.get("averageRating") or None
-    out["review_count"] = record.get("review_count") or record.get("reviews") or None
+    if out["date"] is not None:
+        out["date"] = iso_date(out["date"])
 
-    # Raw description if present
-    out["description"] = (
-        record.get("description")
-        or record.get("subTitle")
-        or record.get("details")
-        or None
-    )
+    # Plain-text description, so the prompt doesn't carry markup
+    if isinstance(out["description"], str):
+        out["description"] = html_to_text(out["description"]) or None
 
     return out
 
 
+# Raw keys extract_deterministic_fields copies as-is into each deterministic
+# field, in the order it tries them; the first truthy one is the field's source
+# (source and category are derived, so their raw keys are kept)
+_DET_SOURCE_KEYS: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("price", ("price",)),
+    ("currency", ("currency", "priceCurrency")),
+    *(
+        (field, keys)
+        for field, keys in _DET_FIELDS
+        if keys and field not in ("source", "category")
+    ),
+)
+
+
+# Per-scrape bookkeeping keys: they say nothing about the product, and leaving
+# them out keeps re-scrapes of an unchanged product on the same prompt (so the
+# same result cache / dedupe key)
+VOLATILE_RAW_KEYS = frozenset(
+    {
+        "scrapedAt",
+        "scrapedTimestamp",
+        "crawledAt",
+        "loadedAt",
+        "viewsCount",
+        "sessionId",
+        "requestId",
+        "url_params",
+        "#debug",
+        "#error",
+    }
+)
+
+
+def raw_extra_fields(
+    record_det: Dict[str, Any], raw_record: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Return the raw record minus volatile keys and those already in `record_det`."""
+    used = set(VOLATILE_RAW_KEYS)
+    for det_key, raw_keys in _DET_SOURCE_KEYS:
+        if record_det.get(det_key) is None:
+            continue
+        for k in raw_keys:
+            if raw_record.get(k):
+                used.add(k)
+                break
+    return {k: v for k, v in raw_record.items() if k not in used}
+
+
+_REFINED_RE = re.compile(r"\b(?:refined|refinement)\b", re.IGNORECASE)
+
+# "collection method" keywords in the prompt's old cascade order (keyed by
+# their first four letters): the earliest listed one found anywhere in the
+# title or description wins, whatever its position. The "cold pressed" and
+# "steam distilled" flags follow from the chosen method. "hexane-free" and
+# "solvent-free" are claims against solvent extraction, not evidence of it.
+_METHOD_RE = re.compile(
+    r"\b(cold[- ]?press|steam[- ]?distil|expeller"
+    r"|solvent(?![- ]?free)|hexane(?![- ]?free))",
+    re.IGNORECASE,
+)
+_METHOD_BY_KEYWORD = {
+    "cold": "cold pressed",
+    "stea": "steam distilled",
+    "expe": "expeller pressed",
+    "solv": "solvent extracted",
+    "hexa": "solvent extracted",
+}
+_METHOD_RANK = {k: i for i, k in enumerate(_METHOD_BY_KEYWORD)}
+
+# Net quantity + unit as written in titles ("2 oz", "60 count", "7 Ounces",
+# "4yards"), mapped onto the prompt's unit names
+_QTY_RE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(fl\.?\s?oz|oz|ounces?|lbs?|pounds?|kg|g|grams?|mg|ml"
+    r"|l|lit(?:er|re)s?|pcs|pieces?|count|ct|yards?)\b",
+    re.IGNORECASE,
+)
+_UNIT_ALIASES = {
+    "ounce": "oz",
+    "ounces": "oz",
+    "lbs": "lb",
+    "pound": "lb",
+    "pounds": "lb",
+    "gram": "g",
+    "grams": "g",
+    "liter": "l",
+    "liters": "l",
+    "litre": "l",
+    "litres": "l",
+    "piece": "pcs",
+    "pieces": "pcs",
+    "ct": "count",
+    "yard": "yards",
+}
+
+
+# Country-code TLDs of supplier websites, for "seller origin"
+_TLD_TO_COUNTRY = {
+    "ae": "United Arab Emirates",
+    "ar": "Argentina",
+    "at": "Austria",
+    "au": "Australia",
+    "bd": "Bangladesh",
+    "be": "Belgium",
+    "br": "Brazil",
+    "ca": "Canada",
+    "ch": "Switzerland",
+    "cl": "Chile",
+    "cn": "China",
+    "co": "Colombia",
+    "cz": "Czech Republic",
+    "de": "Germany",
+    "dk": "Denmark",
+    "eg": "Egypt",
+    "es": "Spain",
+    "et": "Ethiopia",
+    "fi": "Finland",
+    "fr": "France",
+    "gb": "United Kingdom",
+    "gh": "Ghana",
+    "gr": "Greece",
+    "hk": "Hong Kong",
+    "id": "Indonesia",
+    "ie": "Ireland",
+    "il": "Israel",
+    "in": "India",
+    "it": "Italy",
+    "jp": "Japan",
+    "ke": "Kenya",
+    "kr": "South Korea",
+    "lk": "Sri Lanka",
+    "ma": "Morocco",
+    "mx": "Mexico",
+    "my": "Malaysia",
+    "ng": "Nigeria",
+    "nl": "Netherlands",
+    "no": "Norway",
+    "nz": "New Zealand",
+    "pe": "Peru",
+    "ph": "Philippines",
+    "pk": "Pakistan",
+    "pl": "Poland",
+    "pt": "Portugal",
+    "ru": "Russia",
+    "sa": "Saudi Arabia",
+    "se": "Sweden",
+    "sg": "Singapore",
+    "th": "Thailand",
+    "tr": "Turkey",
+    "tw": "Taiwan",
+    "tz": "Tanzania",
+    "ua": "Ukraine",
+    "ug": "Uganda",
+    "uk": "United Kingdom",
+    "us": "United States",
+    "vn": "Vietnam",
+    "za": "South Africa",
+}
+
+
+def tld_country(url: Optional[str]) -> Optional[str]:
+    """Return the country of `url`'s country-code TLD, or None (.com etc.)."""
+    if not url or not isinstance(url, str):
+        return None
+    # supplier websites are often written without a scheme ("acme.com.ng")
+    host = urlparse(url if "//" in url else f"//{url}").hostname
+    if not host:
+        return None
+    return _TLD_TO_COUNTRY.get(host.rstrip(".").rsplit(".", 1)[-1])
+
+
+def _as_text(value: Any) -> str:
+    return value if isinstance(value, str) else "" if value is None else str(value)
+
+
+def derived_columns(record_det: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return output columns computed from the deterministic fields rather than by
+    the model; these override whatever the model returned for them.
+    - platform (from the source domain, when it is a known site)
+    - collection method (by title/description keyword, else "unknown"), and
+      the cold pressed / steam distilled flags matching it
+    - refined (description mentions "refined"/"refinement")
+    - date (the extracted upload/listing date, or None)
+    - image (first entry of the extracted image_urls, or None)
+    - net quantity / unit (first "<number> <unit>" in the title, else the
+      description; left to the model when neither has one)
+    - seller origin (the supplier website's country-code TLD, when the record
+      has no itemLocation; otherwise left to the model)
+    """
+    cols: Dict[str, Any] = {
+        "date": record_det.get("date"),
+        "image": _pick_image(record_det.get("image_urls")),
+    }
+    platform = platform_name(record_det.get("source"))
+    if platform is not None:
+        cols["platform"] = platform
+    if not record_det.get("itemLocation"):
+        origin = tld_country(record_det.get("supplier_url"))
+        if origin is not None:
+            cols["seller origin"] = origin
+
+    title = _as_text(record_det.get("title"))
+    description = _as_text(record_det.get("description"))
+    best = None
+    for m in _METHOD_RE.finditer(f"{title}\n{description}"):
+        keyword = m.group(1)[:4].lower()
+        if best is None or _METHOD_RANK[keyword] < _METHOD_RANK[best]:
+            best = keyword
+            if _METHOD_RANK[best] == 0:
+                break
+    method = _METHOD_BY_KEYWORD[best] if best else "unknown"
+    cols["collection method"] = method
+    cols["cold pressed"] = method == "cold pressed"
+    cols["steam distilled"] = method == "steam distilled"
+    cols["refined"] = _REFINED_RE.search(description) is not None
+
+    m = _QTY_RE.search(title) or _QTY_RE.search(description)
+    if m:
+        qty = float(m.group(1))
+        unit = m.group(2).lower()
+        if unit.startswith("fl"):
+            unit = "fl oz"
+        cols["net quantity"] = int(qty) if qty.is_integer() else qty
+        cols["unit"] = _UNIT_ALIASES.get(unit, unit)
+    return cols
+
+
+# Certification and claim vocabulary: (column, label written, pattern). All of
+# it is compiled into one alternation, one group per entry, so a single scan
+# finds every tag; where entries overlap ("USDA organic" / "organic") the one
+# listed first wins.
+_TAG_VOCABULARY: Tuple[Tuple[str, str, str], ...] = (
+    ("certifications", "USDA Organic", r"usda[- ](?:certified[- ])?organic"),
+    ("certifications", "organic", r"(?:certified[- ])?organic"),
+    ("certifications", "non-GMO", r"non[- ]?gmo|gmo[- ]free"),
+    ("certifications", "GMP", r"gmp(?:[- ]certified)?"),
+    ("certifications", "Fair Trade", r"fair[- ]?trade"),
+    ("certifications", "Kosher", r"kosher"),
+    ("certifications", "Halal", r"halal"),
+    ("certifications", "ECOCERT", r"ecocert"),
+    ("certifications", "COSMOS", r"cosmos[- ](?:organic|natural|certified)"),
+    ("certifications", "Leaping Bunny", r"leaping[- ]bunny"),
+    ("claims", "100% pure", r"100\s?% pure"),
+    ("claims", "all natural", r"(?:all|100\s?%)[- ]natural"),
+    ("claims", "vegan", r"vegan"),
+    ("claims", "cruelty-free", r"cruelty[- ]free"),
+    ("claims", "gluten-free", r"gluten[- ]free"),
+    ("claims", "keto-friendly", r"keto[- ]friendly"),
+    ("claims", "paleo-friendly", r"paleo[- ]friendly"),
+    ("claims", "sugar-free", r"sugar[- ]free"),
+    ("claims", "paraben-free", r"paraben[- ]free"),
+    ("claims", "hexane-free", r"hexane[- ]free"),
+    ("claims", "food grade", r"food[- ]grade"),
+    ("claims", "therapeutic grade", r"therapeutic[- ]grade"),
+    ("claims", "ethically sourced", r"ethically[- ]sourced"),
+    ("claims", "sustainably sourced", r"sustainably[- ](?:sourced|harvested)"),
+    ("claims", "wild harvested", r"wild[- ]?(?:harvested|crafted)"),
+)
+_TAG_RE = re.compile(
+    r"\b(?:" + "|".join(f"({pattern})" for _, _, pattern in _TAG_VOCABULARY) + r")\b",
+    re.IGNORECASE,
+)
+
+
+def keyword_tags(record_det: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Return {"certifications": [...], "claims": [...]} found in title/description."""
+    text = (
+        f"{_as_text(record_det.get('title'))}\n"
+        f"{_as_text(record_det.get('description'))}"
+    )
+    tags: Dict[str, List[str]] = {"certifications": [], "claims": []}
+    for m in _TAG_RE.finditer(text):
+        column, label, _ = _TAG_VOCABULARY[m.lastindex - 1]
+        if label not in tags[column]:
+            tags[column].append(label)
+    return tags
+
+
+def _merge_tags(found: List[str], model_value: Any) -> List[str]:
+    """Vocabulary hits first, then any other entries the model listed."""
+    merged = list(found)
+    seen = {t.lower() for t in merged}
+    if isinstance(model_value, list):
+        for v in model_value:
+            if isinstance(v, str) and v.strip() and v.strip().lower() not in seen:
+                merged.append(v.strip())
+                seen.add(v.strip().lower())
+    return merged
+
+
+def _pick_image(image_urls: Any) -> Optional[str]:
+    """Return the first usable image URL (entries may be strings or {"url": ...})."""
+    for entry in image_urls or ():
+        if isinstance(entry, dict):
+            entry = entry.get("url") or entry.get("src")
+        if isinstance(entry, str) and entry.strip():
+            return entry.strip()
+    return None
+
+
+def _price_per_unit(price: Any, quantity: Any) -> Optional[float]:
+    """Return price / quantity when both are positive numbers, else None."""
+    for v in (price, quantity):
+        if isinstance(v, bool) or not isinstance(v, (int, float)) or v <= 0:
+            return None
+    return price / quantity
+
+
+def _prompt_payload(
+    record_det: Dict[str, Any], raw_record: Dict[str, Any]
+) -> bytes:
+    """Return the product context JSON (UTF-8) that goes into the prompt."""
+    # Put deterministic fields first (helps the model); raw fields they were
+    # copied from are left out so the model doesn't read (and bill) them twice
+    context = {
+        "deterministic": record_det,
+        "raw_extra": raw_extra_fields(record_det, raw_record),
+    }
+    # sorted keys: the same product always renders (and caches) the same way,
+    # whatever key order the scraper happened to emit
+    return orjson.dumps(context, option=orjson.OPT_SORT_KEYS)
+
+
 def build_prompt(record_det: Dict[str, Any], raw_record: Dict[str, Any]) -> str:
-    """Return a user prompt combining instruction, deterministic fields, and the raw record as context."""
-    # Put deterministic fields first (helps the model)
-    context = {"deterministic": record_det, "raw": raw_record}
-    prompt = PROMPT_INSTRUCTION.replace(
-        "<<<INPUT_PRODUCT_JSON>>>", json.dumps(context, ensure_ascii=False)
+    """Return a user prompt combining instruction, deterministic fields, and the rest of the raw record as context."""
+    return render_prompt(
+        _prompt_payload(record_det, raw_record).decode("utf-8"),
+        example_platform(record_det.get("source")),
+    )
+
+
+def build_prompt_bytes(
+    record_det: Dict[str, Any], raw_record: Dict[str, Any]
+) -> bytes:
+    """build_prompt() as UTF-8 bytes, without a decode/encode round trip."""
+    return render_prompt_bytes(
+        _prompt_payload(record_det, raw_record),
+        example_platform(record_det.get("source")),
+    )
+
+
+def _chat_messages(prompt: str) -> List[ChatCompletionMessageParam]:
+    """Build chat messages (system + user) for one prompt.
+
+    The system message carries the fixed instructions (see split_prompt), so it
+    is identical on every call and eligible for provider-side prompt caching.
+    """
+    system, user = split_prompt(prompt)
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+
+
+def _response_content(resp: Any) -> str:
+    """Return the assistant content of a chat completion response."""
+    choice = resp.choices[0]
+    content = choice.message.content
+    if not content and getattr(choice, "finish_reason", None) == "length":
+        # completion budget spent (e.g. on reasoning) before any output; return
+        # nothing so the caller retries instead of parsing the response object
+        return ""
+
+    # Try to extract assistant content robustly from several possible shapes
+    if not content:
+        # Final fallbacks: to_json(), __str__, or json dump
+        try:
+            content = resp.to_json() if hasattr(resp, "to_json") else json.dumps(resp)
+        except Exception:
+            content = str(resp)
+
+    return content
+
+
+# Rough prompt size for rate limiting; JSON-heavy text runs nearer 3 chars per
+# token than the ~4 typical of prose, so this errs towards over-counting
+_CHARS_PER_TOKEN = 3
+
+
+def _estimate_tokens(prompt: str) -> int:
+    """Estimate the input tokens of `prompt` for pacing against a TPM quota."""
+    return len(prompt) // _CHARS_PER_TOKEN + 1
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """True for rate limits, 5xx responses, timeouts and connection errors."""
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        return isinstance(exc, APIConnectionError)  # includes APITimeoutError
+    return status == 429 or status >= 500
+
+
+@lru_cache(maxsize=4)
+def _get_client(endpoint: str, api_key: str, api_version: str) -> AzureOpenAI:
+    """Return one AzureOpenAI client per (endpoint, key, version) for the process.
+
+    The SDK's own retries are off (max_retries=0); worker_job already retries.
+    """
+    return AzureOpenAI(
+        azure_endpoint=endpoint,
+        api_key=api_key,
+        api_version=api_version,
+        max_retries=0,
     )
 
-    return prompt
+
+# Schema-filling needs little reasoning: start low and cheap, and escalate only
+# for a record whose output could not be parsed
+DEFAULT_REASONING_EFFORT = "low"
+DEFAULT_MAX_COMPLETION_TOKENS = 2048
+ESCALATED_REASONING_EFFORT = "high"
+ESCALATED_MAX_COMPLETION_TOKENS = 8192
 
 
 def call_azure_chat_completion(
@@ -217,6 +802,8 @@ def call_azure_chat_completion(
     api_version: str = "2025-01-01-preview",
     temperature: float = 1,
     timeout: int = 60,
+    reasoning_effort: str = DEFAULT_REASONING_EFFORT,
+    max_completion_tokens: int = DEFAULT_MAX_COMPLETION_TOKENS,
 ) -> str:
     """
     Call Azure OpenAI using the AzureOpenAI client and return the assistant content string.
@@ -229,87 +816,377 @@ def call_azure_chat_completion(
       - api_version: Azure API version (default matches your snippet)
       - temperature: model temperature (default 1)
       - timeout: request timeout in seconds
+      - reasoning_effort: "low", "medium" or "high" (reasoning models; default low,
+        which suffices for this formatting task)
+      - max_completion_tokens: completion budget, reasoning tokens included
 
     Returns:
       assistant text (string). If structured extraction fails, returns a best-effort stringified response.
     """
-    # Initialize client
+    # Shared client, so concurrent calls reuse its connection pool
     try:
-        client = AzureOpenAI(
-            azure_endpoint=endpoint, api_key=api_key, api_version=api_version
-        )
+        client = _get_client(endpoint, api_key, api_version)
     except Exception as exc:
         logger.exception(
             "Failed to initialize AzureOpenAI client", extra={"error": str(exc)}
         )
         raise
 
-    # Build chat messages (system + user)
-    messages: List[ChatCompletionMessageParam] = [
-        {"role": "system", "content": "You are a helpful, precise data formatter."},
-        {"role": "user", "content": prompt},
-    ]
-
     try:
         resp = client.chat.completions.create(
             model=deployment,
-            messages=messages,
+            messages=_chat_messages(prompt),
             temperature=temperature,
-            max_completion_tokens=40000,
-            reasoning_effort="high",
+            max_completion_tokens=max_completion_tokens,
+            reasoning_effort=reasoning_effort,
         )
     except Exception as exc:
         # Log and re-raise so caller can handle retries
         logger.exception("Azure OpenAI request failed", extra={"error": str(exc)})
         raise
 
-    content = resp.choices[0].message.content
+    return _response_content(resp)
 
-    # Try to extract assistant content robustly from several possible shapes
-    if not content:
-        # Final fallbacks: to_json(), __str__, or json dump
-        try:
-            content = resp.to_json() if hasattr(resp, "to_json") else json.dumps(resp)
-        except Exception:
-            content = str(resp)
 
-    return content
+async def call_azure_chat_completion_async(
+    client: AsyncAzureOpenAI,
+    deployment: str,
+    prompt: str,
+    temperature: float = 1,
+    reasoning_effort: str = DEFAULT_REASONING_EFFORT,
+    max_completion_tokens: int = DEFAULT_MAX_COMPLETION_TOKENS,
+) -> str:
+    """
+    Async counterpart of call_azure_chat_completion using a caller-owned client.
+
+    The caller creates one AsyncAzureOpenAI per event loop and shares it across
+    concurrent calls. Returns the assistant content string, with the same
+    fallbacks as the sync version.
+    """
+    try:
+        resp = await client.chat.completions.create(
+            model=deployment,
+            messages=_chat_messages(prompt),
+            temperature=temperature,
+            max_completion_tokens=max_completion_tokens,
+            reasoning_effort=reasoning_effort,
+        )
+    except Exception as exc:
+        # Log and re-raise so caller can handle retries
+        logger.exception("Azure OpenAI request failed", extra={"error": str(exc)})
+        raise
 
+    return _response_content(resp)
 
 
-def write_batch_jsonl(records: List[Tuple[Dict[str, Any], Dict[str, Any]]], out_path: Path) -> int:
-    """
-    Write a JSONL file with one line per record. Each line is a JSON object with:
-    {"id": "<index>", "input": {"messages": [{"role":"system","content":"..."}, {"role":"user","content":"<prompt>"}]}}
-    Return number of lines written.
-    """
+
+# Batch input lines are joined and written this many at a time
+JSONL_WRITE_BATCH = 1000
+JSONL_BUFFER_SIZE = 1 << 20
+
+
+def _batch_options(
+    reasoning_effort: Optional[str], max_completion_tokens: Optional[int]
+) -> Dict[str, Any]:
+    options: Dict[str, Any] = {}
+    if reasoning_effort is not None:
+        options["reasoning_effort"] = reasoning_effort
+    if max_completion_tokens is not None:
+        options["max_completion_tokens"] = max_completion_tokens
+    return options
+
+
+def _batch_request_line(
+    idx: int, prompt: str, model: str, options: Dict[str, Any]
+) -> bytes:
+    # Build the messages shape; the batch job will use the same messages per input
+    line = {
+        "custom_id": f"task-{str(idx)}",
+        "method": "POST",
+        "url": "/chat/completions",
+        "body": {
+            "model": model,
+            "messages": _chat_messages(prompt),
+            **options,
+        },
+    }
+    return orjson.dumps(line, option=orjson.OPT_APPEND_NEWLINE)
+
+
+def _write_jsonl_lines(out_path: Path, lines: Iterable[bytes]) -> int:
+    """Write pre-encoded JSONL lines JSONL_WRITE_BATCH at a time; return the count."""
     out_path.parent.mkdir(parents=True, exist_ok=True)
     written = 0
-    with out_path.open("w", encoding="utf-8") as fh:
-        for idx, (det, raw) in enumerate(records):
-            prompt = build_prompt(det, raw)
-            # Build the messages shape; the batch job will use the same messages per input
-            line = {
-                "custom_id": f"task-{str(idx)}",
-                "method": "POST",
-                "url": "/chat/completions",
-                "body": {
-                    "model": "o4-mini",
-                    "messages": [
-                        {"role": "system", "content": "You are a helpful, precise data formatter."},
-                        {"role": "user", "content": prompt}
-                    ],
-                },
-            }
-            fh.write(json.dumps(line, ensure_ascii=False) + "\n")
+    buf: List[bytes] = []
+    with out_path.open("wb", buffering=JSONL_BUFFER_SIZE) as fh:
+        for line in lines:
+            buf.append(line)
             written += 1
+            if len(buf) >= JSONL_WRITE_BATCH:
+                fh.write(b"".join(buf))
+                buf.clear()
+        fh.write(b"".join(buf))
     return written
 
 
+def write_batch_jsonl(
+    records: Iterable[Tuple[Dict[str, Any], Dict[str, Any]]],
+    out_path: Path,
+    model: str = "o4-mini",
+    skip: Container[int] = (),
+    reasoning_effort: Optional[str] = None,
+    max_completion_tokens: Optional[int] = None,
+) -> int:
+    """
+    Write a Batch API input JSONL file with one line per record, each a JSON object:
+    {"custom_id": "task-<index>", "method": "POST", "url": "/chat/completions",
+     "body": {"model": "<model>", "messages": [{"role": "system", ...}, {"role": "user", ...}]}}
+    `model` is the (global batch) deployment name. Records whose index is in `skip`
+    (e.g. already cached) are left out. reasoning_effort / max_completion_tokens
+    are added to each body when given. Return number of lines written.
+    """
+    options = _batch_options(reasoning_effort, max_completion_tokens)
+    return _write_jsonl_lines(
+        out_path,
+        (
+            _batch_request_line(idx, build_prompt(det, raw), model, options)
+            for idx, (det, raw) in enumerate(records)
+            if idx not in skip
+        ),
+    )
+
+
+def group_by_platform(
+    indices: Iterable[int], det_list: List[Dict[str, Any]], size: int
+) -> List[List[int]]:
+    """Split record indices into groups of up to `size` sharing a prompt example."""
+    open_groups: Dict[str, List[int]] = {}
+    groups: List[List[int]] = []
+    for idx in indices:
+        platform = example_platform(det_list[idx].get("source"))
+        group = open_groups.setdefault(platform, [])
+        group.append(idx)
+        if len(group) >= size:
+            groups.append(group)
+            del open_groups[platform]
+    groups.extend(open_groups.values())
+    return groups
+
+
+def build_group_prompt(
+    det_list: List[Dict[str, Any]], raw_list: List[Dict[str, Any]], group: List[int]
+) -> str:
+    """Return one prompt for several records, keyed in the payload by record index."""
+    products = b",".join(
+        b'"%d":%s' % (idx, _prompt_payload(det_list[idx], raw_list[idx]))
+        for idx in group
+    )
+    return render_batch_prompt(
+        (b"{%s}" % products).decode("utf-8"),
+        example_platform(det_list[group[0]].get("source")),
+    )
+
+
+def write_grouped_batch_jsonl(
+    det_list: List[Dict[str, Any]],
+    raw_list: List[Dict[str, Any]],
+    groups: List[List[int]],
+    out_path: Path,
+    model: str = "o4-mini",
+    reasoning_effort: Optional[str] = None,
+    max_completion_tokens: Optional[int] = None,
+) -> int:
+    """
+    Like write_batch_jsonl, but one line per group of records (see
+    group_by_platform), with custom_id "task-<first index in the group>".
+    max_completion_tokens is per record, so each request gets that many times
+    the group size. Return number of lines written.
+    """
+
+    def lines() -> Iterator[bytes]:
+        for group in groups:
+            budget = None
+            if max_completion_tokens is not None:
+                budget = max_completion_tokens * len(group)
+            yield _batch_request_line(
+                group[0],
+                build_group_prompt(det_list, raw_list, group),
+                model,
+                _batch_options(reasoning_effort, budget),
+            )
+
+    return _write_jsonl_lines(out_path, lines())
+
+
+def _prompt_key(deployment: str, prompt: bytes) -> str:
+    """Hex digest identifying a model call: same key, same (cacheable) output."""
+    h = hashlib.blake2b(deployment.encode("utf-8"), digest_size=16)
+    h.update(b"\0")
+    h.update(prompt)
+    return h.hexdigest()
+
+
+def _result_cache_path(cache_dir: Path, key: str) -> Path:
+    """Path of the cached model output for a _prompt_key()."""
+    return cache_dir / key[:2] / f"{key}.json"
+
+
+def _load_cached_result(cache_path: Path) -> Optional[Dict[str, Any]]:
+    """Return the cached parsed model output, or None if absent/unreadable."""
+    try:
+        parsed = orjson.loads(cache_path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def _save_cached_result(cache_path: Path, parsed: Dict[str, Any]) -> None:
+    # write-then-rename, so concurrent runs never read a partial entry
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(orjson.dumps(parsed))
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        logger.warning("Failed to write result cache", extra={"path": str(cache_path)})
+
+
+# Batch jobs take minutes to hours; poll with exponential backoff between these bounds
+BATCH_POLL_INTERVAL_MIN = 10
+BATCH_POLL_INTERVAL_MAX = 300
+BATCH_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+def run_batch_job(client: AzureOpenAI, jsonl_path: Path) -> Dict[int, str]:
+    """
+    Submit a file written by write_batch_jsonl to the Batch API and wait for it.
+
+    Returns the assistant content keyed by record index (from each line's
+    custom_id). Requests that failed, or never ran because the batch failed or
+    expired, are absent from the result.
+    """
+    with jsonl_path.open("rb") as fh:
+        input_file = client.files.create(file=fh, purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/chat/completions",
+        completion_window="24h",
+    )
+    logger.info(
+        "Submitted batch job",
+        extra={"batch_id": batch.id, "input_file_id": input_file.id},
+    )
+
+    delay = BATCH_POLL_INTERVAL_MIN
+    while batch.status not in BATCH_TERMINAL_STATUSES:
+        time.sleep(delay)
+        delay = min(delay * 2, BATCH_POLL_INTERVAL_MAX)
+        batch = client.batches.retrieve(batch.id)
+        logger.info(
+            "Batch job status", extra={"batch_id": batch.id, "status": batch.status}
+        )
+    if batch.status != "completed":
+        logger.error(
+            "Batch job did not complete",
+            extra={"batch_id": batch.id, "status": batch.status},
+        )
+    if batch.error_file_id:
+        logger.warning(
+            "Batch job has failed requests",
+            extra={"batch_id": batch.id, "error_file_id": batch.error_file_id},
+        )
+
+    contents: Dict[int, str] = {}
+    if not batch.output_file_id:
+        return contents
+    output = client.files.content(batch.output_file_id).content
+    for ln in output.splitlines():
+        if not ln.strip():
+            continue
+        try:
+            item = orjson.loads(ln)
+            idx = int(item["custom_id"].rsplit("-", 1)[1])
+            response = item.get("response") or {}
+            if response.get("status_code") != 200:
+                logger.warning(
+                    "Batch request failed",
+                    extra={"index": idx, "error": item.get("error")},
+                )
+                continue
+            contents[idx] = response["body"]["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            logger.warning(
+                "Skipping unreadable batch output line",
+                extra={"error": str(e), "line": ln[:200].decode("utf-8", "replace")},
+            )
+    return contents
+
+
+
+JSON_SUFFIXES = frozenset({".json", ".ndjson", ".jsonl", ".txt"})
+
+
+def _iter_json_files(root: Path) -> Iterator[Path]:
+    """Yield JSON/JSONL files under `root` (recursively), including gzipped ones.
+
+    Walks with os.scandir, so only matching files become Path objects.
+    """
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                    continue
+                stem, ext = os.path.splitext(entry.name)
+                ext = ext.lower()
+                # gzipped dataset downloads, e.g. walmart.dataset.jsonl.gz
+                if ext == ".gz":
+                    ext = os.path.splitext(stem)[1].lower()
+                if ext in JSON_SUFFIXES and entry.is_file():
+                    yield Path(entry.path)
+
+
+def _process_file(
+    path: Path,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], int, Optional[str]]:
+    """Load one raw file and return its deterministic fields and raw records (as
+    parallel lists, reviews removed), the number of records that had reviews and
+    the error that stopped the read, if any.
+
+    Runs in a worker process; if the file fails partway, the records read so far
+    are kept and the error is returned for the caller to report (no traceback is
+    formatted here, so a tree with many bad files doesn't pay for one each).
+    """
+    dets: List[Dict[str, Any]] = []
+    raws: List[Dict[str, Any]] = []
+    removed = 0
+    error = None
+    try:
+        for it in safe_load_json_file(path):
+            if it.pop("reviews", None) is not None:
+                removed += 1
+            dets.append(extract_deterministic_fields(it))
+            raws.append(it)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return dets, raws, removed, error
+
 
 # -------------------------
 # Orchestration
 # -------------------------
+# Reused by parse_and_map_output to decode the JSON object in model output
+_JSON_DECODER = json.JSONDecoder()
+
+# Read failures logged individually before the rest are only summarized
+READ_ERRORS_LOGGED = 3
+
+# Output CSV rows are buffered and written this many at a time
+CSV_WRITE_BATCH = 1000
+CSV_BUFFER_SIZE = 1 << 20
+
+
 def normalize_records(
     input_dir: Path,
     template_csv: Path,
@@ -321,14 +1198,31 @@ def normalize_records(
     concurrency: int = 4,
     batch_size: int = 50,
     max_retries: int = 1,
+    requests_per_minute: Optional[int] = None,
+    tokens_per_minute: Optional[int] = None,
+    use_batch: bool = True,
+    cache_dir: Optional[Path] = None,
+    reasoning_effort: str = DEFAULT_REASONING_EFFORT,
+    max_completion_tokens: int = DEFAULT_MAX_COMPLETION_TOKENS,
+    products_per_call: int = 1,
 ) -> None:
     """
     Main orchestration function.
     - Reads all JSON files under input_dir
     - Builds deterministic contexts
-    - Submits requests to Azure OpenAI (concurrently)
-    - Parses and validates outputs
-    - Writes CSV in order of processing (append mode)
+    - Submits requests to Azure OpenAI: by default as one Batch API job (input
+      JSONL saved next to output_csv); with use_batch=False as live calls
+      (concurrently), paced to stay within requests_per_minute /
+      tokens_per_minute when given (the deployment's quota)
+    - In a batch job, products_per_call > 1 sends that many records (of the same
+      platform) per request; live calls always carry one record
+    - Asks for reasoning_effort / max_completion_tokens; a live call whose output
+      can't be parsed is retried with high effort and a larger budget
+    - Parses and validates outputs; with cache_dir, parsed outputs are cached
+      there by a hash of deployment + prompt and reused instead of calling the
+      model again for an identical prompt
+    - Writes CSV (append mode): in record order for a batch job, in order of
+      completion for live calls
     """
     # Read exact header columns from template CSV
     with template_csv.open("r", encoding="utf-8", newline="") as fh:
@@ -338,6 +1232,15 @@ def normalize_records(
         "Using template CSV header",
         extra={"columns_count": len(header), "columns": header},
     )
+    # columns neither the model nor the deterministic extraction fills
+    unfilled = [
+        c for c in header if c not in CSV_HEADER_SET and c not in _DET_FIELD_NAMES
+    ]
+    if unfilled:
+        logger.warning(
+            "Template columns not produced by the prompt will be left empty",
+            extra={"columns": unfilled},
+        )
 
     # Prepare output CSV
     output_csv.parent.mkdir(parents=True, exist_ok=True)
@@ -346,38 +1249,37 @@ def normalize_records(
         # If exists, don't write header again
         write_header = False
 
-    # Collect all records
-    all_records: List[Tuple[Dict[str, Any], Dict[str, Any]]] = (
-        []
-    )  # (deterministic, raw)
-    files = list(Path(input_dir).glob("**/*"))
-    json_files = [
-        p
-        for p in files
-        if p.is_file() and p.suffix.lower() in {".json", ".ndjson", ".jsonl", ".txt"}
-    ]
+    # Collect all records, column-wise: record i is (det_list[i], raw_list[i])
+    det_list: List[Dict[str, Any]] = []
+    raw_list: List[Dict[str, Any]] = []
+    json_files = list(_iter_json_files(input_dir))
     logger.info(f"Found {len(json_files)} JSON files", extra={"count": len(json_files)})
 
-    for jf in json_files:
-        try:
-            items = safe_load_json_file(jf)
-            for it in items:
-                if "reviews" in it:
-                    del it["reviews"]
-                    logger.info(f"Removed review from record")
-                det = extract_deterministic_fields(it)
-                all_records.append((det, it))
-        except Exception:
-            logger.exception("Failed to read JSON file", extra={"path": str(jf)})
+    # Files are independent and the pre-pass is pure CPU, so spread it over processes
+    removed = 0
+    read_errors: List[Tuple[str, str]] = []
+    with ProcessPoolExecutor() as ex:
+        for jf, (dets, raws, file_removed, error) in zip(
+            json_files, ex.map(_process_file, json_files, chunksize=8)
+        ):
+            det_list.extend(dets)
+            raw_list.extend(raws)
+            removed += file_removed
+            if error is not None:
+                read_errors.append((str(jf), error))
+    # one line for each of the first few failures, then a single summary
+    for path, error in read_errors[:READ_ERRORS_LOGGED]:
+        logger.error("Failed to read JSON file", extra={"path": path, "error": error})
+    if read_errors:
+        logger.warning(
+            f"Read failures in {len(read_errors)} of {len(json_files)} files",
+            extra={"count": len(read_errors), "files": read_errors[:100]},
+        )
+    logger.info(f"Stripped reviews from {removed} records", extra={"removed": removed})
 
-    total = len(all_records)
+    total = len(det_list)
     logger.info(f"Prepared {total} records", extra={"total_records": total})
 
-    jsonl_out_path = Path(f"{os.path.splitext(output_csv)[0]}.jsonl")
-    write_batch_jsonl(all_records, jsonl_out_path)
-
-    sys.exit(0)
-
     # Helper to validate/parse model output
     def parse_and_map_output(model_text: str) -> Optional[Dict[str, Any]]:
         if not model_text:
@@ -390,13 +1292,16 @@ def normalize_records(
                 txt = "\n".join(txt.splitlines()[1:-1])
             except Exception:
                 txt = txt.strip("` \n")
-        # find first '{' and last '}' to try to extract JSON substring
+        # decode the first JSON object in the text, ignoring anything after it
         first = txt.find("{")
-        last = txt.rfind("}")
-        if first != -1 and last != -1 and last > first:
-            txt = txt[first : last + 1]
         try:
-            parsed = json.loads(txt)
+            if first == -1:
+                raise ValueError("no JSON object in model output")
+            try:
+                parsed = orjson.loads(txt[first:] if first else txt)
+            except orjson.JSONDecodeError:
+                # trailing text after the object: decode just the first one
+                parsed, _ = _JSON_DECODER.raw_decode(txt, first)
             if isinstance(parsed, dict):
                 return parsed
             return None
@@ -407,92 +1312,344 @@ def normalize_records(
             )
             return None
 
-    # Worker function: call LLM and get normalized object
-    def worker_job(
-        idx_and_pair: Tuple[int, Tuple[Dict[str, Any], Dict[str, Any]]],
+    # Rows are built as lists in header order for csv.writer
+    col_index = {col: i for i, col in enumerate(header)}
+    # "price per unit" is computed from the row's price and net quantity
+    price_i = col_index.get("price")
+    quantity_i = col_index.get("net quantity")
+    per_unit_i = col_index.get("price per unit")
+    if price_i is None or quantity_i is None:
+        per_unit_i = None
+
+    def build_row(parsed: Dict[str, Any], deterministic: Dict[str, Any]) -> List[Any]:
+        # one cell per header column (missing -> None)
+        normalized_row = [parsed.get(col) for col in header]
+        # columns computed in Python take precedence over the model's values
+        for k, v in derived_columns(deterministic).items():
+            i = col_index.get(k)
+            if i is not None:
+                normalized_row[i] = v
+        # But also include any deterministic fields if null in parsed output
+        for k, v in deterministic.items():
+            i = col_index.get(k)
+            if i is not None and normalized_row[i] is None:
+                normalized_row[i] = v
+        # certifications/claims: vocabulary matches plus the model's own finds
+        for k, found in keyword_tags(deterministic).items():
+            i = col_index.get(k)
+            if i is not None:
+                normalized_row[i] = _merge_tags(found, normalized_row[i])
+        if per_unit_i is not None:
+            normalized_row[per_unit_i] = _price_per_unit(
+                normalized_row[price_i], normalized_row[quantity_i]
+            )
+        # convert lists/dicts to JSON strings for CSV cells here, in the worker,
+        # so the writer only writes (same compact form as scripts/process_batch.py)
+        for i, v in enumerate(normalized_row):
+            if isinstance(v, (list, dict)):
+                normalized_row[i] = orjson.dumps(v).decode()
+        return normalized_row
+
+    def placeholder_row(idx: int) -> List[Any]:
+        # a placeholder row with url and nulls, for records that failed
+        placeholder: List[Any] = [None] * len(header)
+        url_i = col_index.get("url")
+        if url_i is not None:
+            placeholder[url_i] = det_list[idx].get("url") or raw_list[idx].get("url")
+        return placeholder
+
+    def open_output_csv() -> Tuple[Any, Any]:
+        # big write buffer; rows are handed to writerows() CSV_WRITE_BATCH at a time
+        fh_out = open(
+            output_csv, "a", encoding="utf-8", newline="", buffering=CSV_BUFFER_SIZE
+        )
+        writer = csv.writer(fh_out)
+        if write_header:
+            writer.writerow(header)
+        return fh_out, writer
+
+    if use_batch:
+        # only the first record with a given prompt, and only without a cached
+        # result, goes into the batch job; repeats reuse that record's output
+        keys = [
+            _prompt_key(deployment, build_prompt_bytes(det, raw))
+            for det, raw in zip(det_list, raw_list)
+        ]
+        first_of: Dict[str, int] = {}
+        repeated: Set[str] = set()
+        cached: Dict[int, Dict[str, Any]] = {}
+        for idx, key in enumerate(keys):
+            if key in first_of:
+                repeated.add(key)
+                continue
+            first_of[key] = idx
+            if cache_dir is not None:
+                hit = _load_cached_result(_result_cache_path(cache_dir, key))
+                if hit is not None:
+                    cached[idx] = hit
+        if cache_dir is not None:
+            logger.info(
+                f"Reusing {len(cached)} cached results", extra={"cached": len(cached)}
+            )
+        if repeated:
+            logger.info(
+                f"{total - len(first_of)} records repeat an earlier prompt",
+                extra={"repeats": total - len(first_of)},
+            )
+
+        contents: Dict[int, str] = {}
+        groups: List[List[int]] = []
+        if len(cached) < len(first_of):
+            skip = {idx for idx, key in enumerate(keys) if first_of[key] != idx}
+            skip.update(cached)
+            jsonl_out_path = Path(f"{os.path.splitext(output_csv)[0]}.jsonl")
+            if products_per_call > 1:
+                groups = group_by_platform(
+                    (idx for idx in range(total) if idx not in skip),
+                    det_list,
+                    products_per_call,
+                )
+                write_grouped_batch_jsonl(
+                    det_list,
+                    raw_list,
+                    groups,
+                    jsonl_out_path,
+                    model=deployment,
+                    reasoning_effort=reasoning_effort,
+                    max_completion_tokens=max_completion_tokens,
+                )
+            else:
+                write_batch_jsonl(
+                    zip(det_list, raw_list),
+                    jsonl_out_path,
+                    model=deployment,
+                    skip=skip,
+                    reasoning_effort=reasoning_effort,
+                    max_completion_tokens=max_completion_tokens,
+                )
+            client = _get_client(azure_endpoint, azure_key, api_version)
+            contents = run_batch_job(client, jsonl_out_path)
+        # a grouped reply is one {index: output} object per request; split it
+        replies: Dict[int, Dict[str, Any]] = {}
+        missing: List[int] = []
+        for group in groups:
+            envelope = parse_and_map_output(contents.pop(group[0], "")) or {}
+            for idx in group:
+                product = envelope.get(str(idx))
+                if isinstance(product, dict):
+                    replies[idx] = product
+                else:
+                    missing.append(idx)
+        if missing:
+            # retry records left out of their group's reply one per request
+            logger.warning(
+                f"{len(missing)} records missing from grouped replies; "
+                "retrying them one per request",
+                extra={"missing": len(missing)},
+            )
+            retry = set(missing)
+            retry_path = Path(f"{os.path.splitext(output_csv)[0]}.retry.jsonl")
+            write_batch_jsonl(
+                zip(det_list, raw_list),
+                retry_path,
+                model=deployment,
+                skip={idx for idx in range(total) if idx not in retry},
+                reasoning_effort=reasoning_effort,
+                max_completion_tokens=max_completion_tokens,
+            )
+            for idx, text in run_batch_job(client, retry_path).items():
+                parsed = parse_and_map_output(text)
+                if parsed is not None:
+                    replies[idx] = parsed
+        # outputs of prompts that occur again later in the run
+        shared: Dict[str, Optional[Dict[str, Any]]] = {}
+        fh_out, writer = open_output_csv()
+        with fh_out:
+            pending: List[List[Any]] = []
+            for idx, deterministic in enumerate(det_list):
+                key = keys[idx]
+                if key in shared:
+                    parsed = shared[key]
+                else:
+                    parsed = cached.get(idx)
+                    if parsed is None:
+                        if groups:
+                            parsed = replies.get(idx)
+                        else:
+                            parsed = parse_and_map_output(contents.get(idx, ""))
+                        if parsed is not None and cache_dir is not None:
+                            _save_cached_result(
+                                _result_cache_path(cache_dir, key), parsed
+                            )
+                    if key in repeated:
+                        shared[key] = parsed
+                if parsed is not None:
+                    pending.append(build_row(parsed, deterministic))
+                else:
+                    pending.append(placeholder_row(idx))
+                if len(pending) >= CSV_WRITE_BATCH:
+                    writer.writerows(pending)
+                    pending.clear()
+            writer.writerows(pending)
+        logger.info(
+            "Normalization complete",
+            extra={
+                "total_processed": total,
+                "normalized": len(replies) if groups else len(contents),
+                "cached": len(cached),
+                "output_csv": str(output_csv),
+            },
+        )
+        return
+
+    if products_per_call > 1:
+        logger.warning("products_per_call only applies to batch jobs; ignoring it")
+
+    # Quota pacing shared by all workers (refilled per second from per-minute limits)
+    request_bucket = (
+        TokenBucket(requests_per_minute / 60) if requests_per_minute else None
+    )
+    token_bucket = TokenBucket(tokens_per_minute / 60) if tokens_per_minute else None
+
+    # Calls in flight by prompt key; a record whose prompt is already being
+    # normalized waits for that result instead of making the same call again
+    inflight: Dict[str, "asyncio.Future[Optional[Dict[str, Any]]]"] = {}
+
+    # Worker coroutine: call LLM and get normalized object
+    async def worker_job(client: AsyncAzureOpenAI, idx: int) -> Optional[List[Any]]:
+        deterministic = det_list[idx]
+        prompt_bytes = build_prompt_bytes(deterministic, raw_list[idx])
+        key = _prompt_key(deployment, prompt_bytes)
+        same = inflight.get(key)
+        if same is not None:
+            parsed = await same
+        else:
+            future = asyncio.get_running_loop().create_future()
+            inflight[key] = future
+            parsed = None
+            try:
+                parsed = await fetch_parsed(client, idx, key, prompt_bytes)
+            finally:
+                del inflight[key]
+                future.set_result(parsed)
+        if parsed is None:
+            return None
+        # identical prompts mean identical deterministic fields, so the row is too
+        normalized_row = build_row(parsed, deterministic)
+        logger.info(f"Successfully normalized row - {idx}")
+        return normalized_row
+
+    async def fetch_parsed(
+        client: AsyncAzureOpenAI, idx: int, key: str, prompt_bytes: bytes
     ) -> Optional[Dict[str, Any]]:
-        idx, (deterministic, raw) = idx_and_pair
-        prompt = build_prompt(deterministic, raw)
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = _result_cache_path(cache_dir, key)
+            hit = _load_cached_result(cache_path)
+            if hit is not None:
+                return hit
+        prompt = prompt_bytes.decode("utf-8")
+        prompt_tokens = _estimate_tokens(prompt)
+        effort, max_tokens = reasoning_effort, max_completion_tokens
         for attempt in range(max_retries + 1):
+            # wait for quota up front rather than running into 429s
+            if request_bucket is not None:
+                await request_bucket.acquire_async()
+            if token_bucket is not None:
+                await token_bucket.acquire_async(prompt_tokens)
             try:
-                content = call_azure_chat_completion(
-                    endpoint=azure_endpoint,
+                content = await call_azure_chat_completion_async(
+                    client,
                     deployment=deployment,
-                    api_key=azure_key,
                     prompt=prompt,
-                    api_version=api_version,
                     temperature=1,
+                    reasoning_effort=effort,
+                    max_completion_tokens=max_tokens,
                 )
                 parsed = parse_and_map_output(content)
                 if parsed is None:
-                    # retry once with slightly different instruction
+                    # retry with more reasoning and a larger completion budget
                     logger.warning(
-                        "Model returned unparsable output, retrying once",
+                        "Model returned unparsable output, retrying with more effort",
                         extra={"index": idx},
                     )
-                    time.sleep(1)
+                    effort = ESCALATED_REASONING_EFFORT
+                    max_tokens = max(max_tokens, ESCALATED_MAX_COMPLETION_TOKENS)
+                    await asyncio.sleep(1)
                     continue
-                # ensure keys for all header columns present (set missing -> None)
-                normalized_row = {
-                    col: parsed.get(col) if isinstance(parsed, dict) else None
-                    for col in header
-                }
-                # But also include any deterministic fields if null in parsed output
-                for k, v in deterministic.items():
-                    if k in normalized_row and (normalized_row[k] is None):
-                        normalized_row[k] = v
-                logger.info(f"Successfully normalized row - {idx}")
-                return normalized_row
+                if cache_path is not None:
+                    _save_cached_result(cache_path, parsed)
+                return parsed
             except Exception as e:
                 logger.exception(
                     "Worker job exception",
                     extra={"index": idx, "attempt": attempt, "error": str(e)},
                 )
-                time.sleep(1 + attempt * 2)
+                if not _is_retryable(e):
+                    break
+                if getattr(e, "status_code", None) == 429:
+                    # quota is tighter than configured: slow down for a minute
+                    for bucket in (request_bucket, token_bucket):
+                        if bucket is not None:
+                            bucket.throttle()
+                else:
+                    await asyncio.sleep(1 + attempt * 2)
         logger.error("Worker job failed after retries", extra={"index": idx})
         return None
 
-    # Process in micro-batches but using ThreadPool for concurrency
-    results: List[Dict[str, Any]] = []
-    with ThreadPoolExecutor(max_workers=concurrency) as ex:
-        futures = {}
-        for idx, pair in enumerate(all_records):
-            fut = ex.submit(worker_job, (idx, pair))
-            futures[fut] = idx
-
+    # Single consumer: rows are written in completion order as workers finish
+    async def write_rows(
+        rows: "asyncio.Queue[Optional[Tuple[int, Optional[List[Any]]]]]",
+    ) -> int:
         processed = 0
-        with output_csv.open("a", encoding="utf-8", newline="") as fh_out:
-            writer = csv.DictWriter(fh_out, fieldnames=header)
-            if write_header:
-                writer.writeheader()
-            for fut in as_completed(futures):
-                idx = futures[fut]
+        fh_out, writer = open_output_csv()
+        with fh_out:
+            pending: List[List[Any]] = []
+            while True:
+                item = await rows.get()
+                if item is None:
+                    break
+                idx, row = item
                 processed += 1
-                try:
-                    row = fut.result()
-                    if row:
-                        # Ensure all fields present and are simple serializable types
-                        for k in header:
-                            v = row.get(k)
-                            # convert lists to JSON strings for CSV cells
-                            if isinstance(v, (list, dict)):
-                                row[k] = json.dumps(v, ensure_ascii=False)
-                        writer.writerow({k: row.get(k) for k in header})
-                    else:
-                        # write a placeholder row with url and nulls
-                        _, (det, raw) = all_records[idx]
-                        placeholder = {c: None for c in header}
-                        placeholder["url"] = det.get("url") or raw.get("url")
-                        writer.writerow(placeholder)
-                    logger.info(f"Job processed successfully - {idx}")
-                except Exception:
-                    logger.exception(
-                        "Failed to process future result", extra={"index": idx}
-                    )
+                pending.append(row or placeholder_row(idx))
+                logger.info(f"Job processed successfully - {idx}")
+                if len(pending) >= CSV_WRITE_BATCH:
+                    writer.writerows(pending)
+                    pending.clear()
                 if processed % 50 == 0:
                     logger.info(
                         "Progress", extra={"processed": processed, "total": total}
                     )
+            writer.writerows(pending)
+        return processed
+
+    # One event loop and one client for all requests; the semaphore caps how
+    # many are in flight at once
+    async def dispatch() -> int:
+        sem = asyncio.Semaphore(concurrency)
+        rows: "asyncio.Queue[Optional[Tuple[int, Optional[List[Any]]]]]" = (
+            asyncio.Queue()
+        )
+        async with AsyncAzureOpenAI(
+            azure_endpoint=azure_endpoint,
+            api_key=azure_key,
+            api_version=api_version,
+            max_retries=0,
+        ) as client:
+
+            async def _worker(idx: int) -> None:
+                async with sem:
+                    row = await worker_job(client, idx)
+                await rows.put((idx, row))
+
+            writer_task = asyncio.ensure_future(write_rows(rows))
+            try:
+                await asyncio.gather(*(_worker(idx) for idx in range(total)))
+            finally:
+                await rows.put(None)
+            return await writer_task
+
+    processed = asyncio.run(dispatch())
 
     logger.info(
         "Normalization complete",
@@ -544,7 +1701,7 @@ def _parse_args():
         "--concurrency",
         type=int,
         default=4,
-        help="Number of concurrent worker threads.",
+        help="Maximum number of Azure OpenAI requests in flight at once.",
     )
     parser.add_argument(
         "--batch-size",
@@ -556,7 +1713,58 @@ def _parse_args():
         "--max-retries",
         type=int,
         default=1,
-        help="Number of retries for unparsable model outputs.",
+        help="Number of retries for unparsable model outputs (at high effort).",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=("batch", "live"),
+        default="batch",
+        help="'batch' submits one Azure OpenAI Batch API job (cheaper, for large "
+        "runs); 'live' calls the model per record concurrently.",
+    )
+    parser.add_argument(
+        "--reasoning-effort",
+        choices=("low", "medium", "high"),
+        default=DEFAULT_REASONING_EFFORT,
+        help="Reasoning effort for reasoning-model deployments (default: low).",
+    )
+    parser.add_argument(
+        "--max-completion-tokens",
+        type=int,
+        default=DEFAULT_MAX_COMPLETION_TOKENS,
+        help="Completion token budget per record, reasoning included "
+        f"(default: {DEFAULT_MAX_COMPLETION_TOKENS}).",
+    )
+    parser.add_argument(
+        "--products-per-call",
+        type=int,
+        default=1,
+        help="Records of the same platform sent per batch request, sharing one "
+        "copy of the instructions (batch mode only; default: 1).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=os.path.join("data", "_cache", "normalize"),
+        help="Directory caching parsed model outputs by prompt hash "
+        "(default: data/_cache/normalize).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Always call the model, even for prompts with a cached result.",
+    )
+    parser.add_argument(
+        "--requests-per-minute",
+        type=int,
+        default=os.getenv("AZURE_OPENAI_RPM"),
+        help="Deployment's requests-per-minute quota to pace calls to (default: none)",
+    )
+    parser.add_argument(
+        "--tokens-per-minute",
+        type=int,
+        default=os.getenv("AZURE_OPENAI_TPM"),
+        help="Deployment's tokens-per-minute quota to pace calls to (default: none)",
     )
     return parser.parse_args()
 
@@ -583,4 +1791,11 @@ if __name__ == "__main__":
         concurrency=args.concurrency,
         batch_size=args.batch_size,
         max_retries=args.max_retries,
+        requests_per_minute=args.requests_per_minute,
+        tokens_per_minute=args.tokens_per_minute,
+        use_batch=args.mode == "batch",
+        cache_dir=Path(args.cache_dir) if args.use_cache else None,
+        reasoning_effort=args.reasoning_effort,
+        max_completion_tokens=args.max_completion_tokens,
+        products_per_call=args.products_per_call,
     )
@@ -1,3 +1,42 @@
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet, Optional, Tuple
+
+import orjson
+
+# Output columns the prompt asks the model for, in order
+CSV_HEADER: Tuple[str, ...] = (
+    "platform",
+    "date",
+    "product ID",
+    "name",
+    "scientific name",
+    "product form",
+    "net quantity",
+    "unit",
+    "price",
+    "price per unit",
+    "seller name",
+    "seller type",
+    "seller origin",
+    "number of reviews",
+    "average rating",
+    "sales rank or badge",
+    "certifications",
+    "claims",
+    "transparency origin",
+    "cold pressed",
+    "steam distilled",
+    "refined",
+    "list of ingredients",
+    "image",
+    "product description",
+    "return policy",
+    "collection method",
+)
+CSV_HEADER_SET: FrozenSet[str] = frozenset(CSV_HEADER)
+
 # -------------------------
 # Prompt template and LLM call
 # -------------------------
@@ -8,86 +47,235 @@ You will convert ONE scraped product JSON (given below) into exactly ONE JSON ob
 Return **only** the JSON object — no explanation, no commentary, no code fences.
 
 TEMPLATE CSV HEADER (keys MUST match these strings exactly, in this order):
-["platform","date","product ID","name","scientific name","product form","net quantity","unit","price","price per unit","seller name","seller type","seller origin","number of reviews","average rating","sales rank or badge","certifications","claims","transparency origin","cold pressed","steam distilled","refined","list of ingredients","image","product description","return policy","collection method"]
-
-OUTPUT FORMAT REQUIREMENTS
-- Return a single JSON object with the keys shown above, no extra keys.
-- Keys must be exactly the same string as the header (including spaces).
-- Types:
-  - Strings: use JSON strings or `null`.
-  - Numbers: use JSON numbers (no commas). If unknown -> `null`.
-  - Booleans: `true` or `false` (logical).
-  - Arrays: JSON arrays (e.g., for "list of ingredients").
-- Date format for "date": ISO date `YYYY-MM-DD`. If input has a date (uploadDate, listedOn, lastUpdated), convert it to ISO date. If none, put `null`.
-- If you cannot determine a value, set it to `null` (do not invent).
-- For fields that must be inferred, follow the rules below exactly.
-
-FIELD-BY-FIELD RULES / INFERENCE LOGIC
-- "platform": short name of the source site (e.g., "amazon", "ebay", "etsy", "alibaba", "jumia", "walmart"). If URL present, infer from domain.
-- "date": prefer these fields (in order) if present in input: `uploadDate`, `listedOn`, `lastUpdated` (parse and convert). If the value contains only a timestamp, convert to date. Else `null`.
-- "product ID": use the record's SKU/ID/itemNumber/productId/sku/id field (first available). String.
-- "name": canonical product title/name.
-- "scientific name": botanical/scientific name if explicitly present in title/description or brand notes (e.g., "Moringa oleifera"); otherwise `null`.
-- "product form": choose exactly one of these strings (lowercase): `oil`, `powder`, `extract`, `capsule`, `tablet`, `seed`, `butter`, `liquid`, `other`. Determine from `type`, `title`, `description`, `variations`, or keywords like "oil","powder","extract","capsule","tablet","seed","butter","liquid". If ambiguous, pick best match; if not match, `other`.
-- "net quantity": numeric quantity if present (e.g., "2 oz" -> 2, "60 count" -> 60). If not inferable, `null`.
-- "unit": unit string for net quantity (e.g., "g", "kg", "oz", "ml", "count", "pcs", "l"). If not determined, `null`.
-- "price": numeric price in local currency (use the primary price field; remove currency symbols and thousand separators). If multiple price ranges present, use the single-item `price` or smallest numeric price. If unknown, `null`.
-- "price per unit": numeric price / net quantity when both are known and unit is consistent; otherwise `null`.
-- "seller name": seller/publisher/manufacturer name (from `seller`, `creator`, `brand`, or `supplierWebsite`).
-- "seller type": infer one of the strings: `"manufacturer"`, `"wholesaler"`, `"retailer"`, `"marketplace"`, `"other"`. Use supplierWebsite domain or fields like "supplier", "company", or presence of "manufacturer" or "supplier" in description. If uncertain, return `"other"`.
-- "seller origin": country name (e.g., "United States") inferred from seller location fields (itemLocation, supplierUrl domain TLD, or address in text). If cannot determine, `null`.
-- "number of reviews": numeric total reviews (e.g., `numberOfReviews`, `review_count`, `totalRatings`). If not present, `null`.
-- "average rating": numeric rating value (e.g., `reviewRatingValue`, `rating.average`). If not present, `null`.
-- "sales rank or badge": textual badge like "Best Seller", "Top Rated", "% sold" or "318 sold" summary; prefer explicit badge fields, else derive short text from sold counts (e.g., "318 sold") or isSponsored flag. If none, `null`.
-- "certifications": array of strings (e.g., ["organic","non-GMO","GMP"]) if found in title/description/labels; else `[]`.
-- "claims": array of short claims found in title/description/labels (e.g., ["non-GMO","vegan"]) or `[]`.
-- "transparency origin": any explicit origin statement like "Made in USA" or supply-chain notes (string) if found in description or supplier fields; otherwise `null`.
-- "cold pressed": boolean `true` if description/title contains "cold pressed" or "cold-pressed"; else `false`.
-- "steam distilled": boolean `true` if description/title contains "steam distilled" or "steam-distilled"; else `false`.
-- "refined": boolean `true` if description contains "refined" or "refinement"; else `false`.
-- "list of ingredients": array of ingredient names parsed from description or title; if none, empty array `[]`.
-- "image": main image URL string (pick `image` field or first entry in `images`/`additionalPhotosArray`).
-- "product description": cleaned textual description (trimmed to plain text; remove extraneous HTML if present). If no description, `null`.
-- "return policy": string from shipping/returns fields. If none, `null`.
-- "collection method": infer one of `["cold pressed","steam distilled","expeller pressed","solvent extracted","other","unknown"]` based on description keywords. If description contains "cold", choose "cold pressed"; if "steam", choose "steam distilled"; if "expeller", "expeller pressed"; if "solvent" / "hexane" -> "solvent extracted"; otherwise "unknown".
-
-ADDITIONAL INSTRUCTIONS
-- Arrays must be JSON arrays. If you have no entries for "certifications" or "claims" or "list of ingredients", return an empty JSON array `[]`.
-- Use lowercase for "product form" and "collection method" values exactly as listed above.
-- Use the scientific name of the base plant-based ingredient
-- Keep numeric fields as numbers (no quotes).
-- For textual arrays (certifications, claims, list of ingredients), remove duplicates and trim whitespace.
-- Do not return nested objects (all values must be primitive, number, boolean, string, or array).
-- If the input contains URLs, domains may be used to infer seller origin (e.g., `.ng` -> Nigeria). Country inference should be the full English country name.
-- Exactly one JSON object must be returned and nothing else.
-
-CONTEXT: the single product JSON to normalize is provided below. Process it according to the rules above.
+<<<CSV_HEADER>>>
+
+OUTPUT FORMAT
+- One JSON object with exactly the header keys above (same strings, including spaces) and no others.
+- Values are JSON strings, numbers (no quotes, no thousand separators), booleans, arrays of strings, or `null` — never nested objects.
+- If a value cannot be determined, use the field's "else" value below, or `null` (do not invent).
+- Arrays: trimmed strings, no duplicates; `[]` when empty.
+
+FIELD RULES (one line per field; "from" = input fields to use, first available wins; "enum" = the only allowed values, lowercase; "else" = value when undeterminable)
+{"product ID": {"type": "string", "from": ["sku", "id", "itemNumber", "productId"]},
+"name": {"type": "string", "rule": "canonical product title/name"},
+"scientific name": {"type": "string", "rule": "botanical name of the base plant ingredient if explicit in title/description/brand notes, e.g. 'Moringa oleifera'", "else": null},
+"product form": {"enum": ["oil", "powder", "extract", "capsule", "tablet", "seed", "butter", "liquid", "other"], "from": ["type", "title", "description", "variations"], "rule": "best keyword match", "else": "other"},
+"net quantity": {"type": "number", "rule": "'2 oz' -> 2, '60 count' -> 60", "else": null},
+"unit": {"type": "string", "rule": "unit of net quantity, e.g. g, kg, oz, ml, count, pcs, l", "else": null},
+"price": {"type": "number", "rule": "primary single-item price in local currency without symbols; for price ranges the smallest", "else": null},
+"seller name": {"type": "string", "from": ["seller", "creator", "brand", "supplierWebsite"]},
+"seller type": {"enum": ["manufacturer", "wholesaler", "retailer", "marketplace", "other"], "rule": "from supplierWebsite domain, supplier/company fields, or 'manufacturer'/'supplier' in description", "else": "other"},
+"seller origin": {"type": "string", "rule": "full English country name from itemLocation or an address in the text", "else": null},
+"number of reviews": {"type": "number", "from": ["numberOfReviews", "review_count", "totalRatings"], "else": null},
+"average rating": {"type": "number", "from": ["reviewRatingValue", "rating.average"], "else": null},
+"sales rank or badge": {"type": "string", "rule": "explicit badge ('Best Seller', 'Top Rated'), else short sold-count text ('318 sold') or the isSponsored flag", "else": null},
+"certifications": {"type": "array", "rule": "from title/description/labels, e.g. ['organic', 'non-GMO', 'GMP']", "else": []},
+"claims": {"type": "array", "rule": "short claims from title/description/labels, e.g. ['non-GMO', 'vegan']", "else": []},
+"transparency origin": {"type": "string", "rule": "explicit origin or supply-chain statement from description/supplier fields, e.g. 'Made in USA'", "else": null},
+"list of ingredients": {"type": "array", "rule": "ingredient names from description or title", "else": []},
+"product description": {"type": "string", "rule": "plain text", "else": null},
+"return policy": {"type": "string", "from": ["shipping/returns fields"], "else": null}}
+"platform", "date", "price per unit", "image", "cold pressed", "steam distilled", "refined" and "collection method" are filled in after your answer: return `null` for them.
+
+<<<EXAMPLES>>>
+
+CONTEXT: the product JSON to normalize is provided below. Process it according to the rules above.
+It has two parts: "deterministic" holds fields already extracted from the scraped record (url, source, title, price, currency, image_urls, upc, mpn, seller_name, itemLocation, supplier_url, category, rating, review_count, description, date), and "raw_extra" holds the record's remaining fields as scraped. Field names in the rules above refer to the scraped record; a field that was extracted appears only under "deterministic" (e.g. `title` as "title", `seller` as "seller_name", `supplierWebsite` as "supplier_url", `images` as "image_urls").
 
 <<<INPUT_PRODUCT_JSON>>>
 
-EXAMPLES (these are required output formats — replicate this style exactly):
+Return the normalized JSON now.
 
-1) Alibaba sample input -> example output
-Input (summarized context): the Alibaba product has fields: name, sku, brand, link, description, image, price, uploadDate, creator, additionalPhotosArray, priceRange, minOrder.
-Expected normalized JSON output:
-{"platform":"Alibaba","date":"2025-10-24","product ID":"1600906122423","name":"Bulk Hot Sale Rosehip Castor Jojoba Avocado Moringa Seed Argan Emu Aloe Vera Camellia Seeds Oil New Carrier Oil","scientific name":"Ricinus communis","product form":"oil","net quantity":2,"unit":"pcs","price":489.18,"price per unit":244.59,"seller name":"Ji'an Borui Spice Oil Co., Ltd.","seller type":"manufacturer","seller origin":null,"number of reviews":null,"average rating":null,"sales rank or badge":null,"certifications":["organic"],"claims":["bulk","dropshipping available","free shipping"],"transparency origin":null,"cold pressed":false,"steam distilled":false,"refined":null,"list of ingredients":["rosehip oil","castor oil","jojoba oil","avocado oil","moringa seed oil","argan oil","emu oil","aloe vera oil","camellia seed oil"],"image":"https://sc04.alicdn.com/kf/H45c6e2bf50e3497e9a5e22b3d6481bc6H.jpg","product description":"Bulk Hot Sale Rosehip Castor Jojoba Avocado Moringa Seed Argan Emu Aloe Vera Camellia Seeds Oil New Carrier Oil , Find Complete Details about Bulk Hot Sale ...","return policy":null,"collection method":"unknown"}
+END OF PROMPT
+"""
 
-2) eBay sample input -> example output
-{"platform":"Ebay","date":null,"product ID":"266609431231","name":"Global Healing Organic Moringa Liquid Supplement - Non-GMO, Vegan Friendly - 2oz","scientific name":"Moringa oleifera","product form":"extract","net quantity":2,"unit":"oz","price":24.95,"price per unit":12.475,"seller name":"Global Healing Center","seller type":"retailer","seller origin":"United States","number of reviews":null,"average rating":null,"sales rank or badge":"318 sold","certifications":["non-GMO"],"claims":[],"transparency origin":null,"cold pressed":false,"steam distilled":false,"refined":null,"list of ingredients":[],"image":"https://i.ebayimg.com/images/g/Q1IAAOSwjVNlg8Fa/s-l1000.webp","product description":null,"return policy":null,"collection method":"other"}
 
-3) Etsy sample input -> example output
-{"platform":"Etsy","date":"2025-10-17","product ID":"4388599500","name":"Oil of Oregano, Black Seed & Moringa Softgels 3 in 1 – 60 Vegan Capsules | Natural Wellness Blend | Non-GMO","scientific name":"Moringa oleifera","product form":"capsule","net quantity":60,"unit":"count","price":58.99,"price per unit":0.9831666666666667,"seller name":"HerbalOrganicWork","seller type":"retailer","seller origin":null,"number of reviews":null,"average rating":null,"sales rank or badge":null,"certifications":["non-GMO"],"claims":["vegan"],"transparency origin":null,"cold pressed":false,"steam distilled":false,"refined":null,"list of ingredients":[],"image":"https://i.etsystatic.com/62129839/r/il/a80af3/7296497478/il_794xN.7296497478_dmzo.jpg","product description":null,"return policy":null,"collection method":"other"}
+PROMPT_INSTRUCTION = PROMPT_INSTRUCTION.replace(
+    "<<<CSV_HEADER>>>", orjson.dumps(list(CSV_HEADER)).decode("utf-8")
+)
 
-4) Jumia sample input -> example output
-{"platform":"Jumia","date":"2025-10-25","product ID":"FA203MW694IUFNAFAMZ","name":"Quality Italian 7star Cashmere SuperWool Senator Fabric Material: Light Onion Color(4yards)","scientific name":null,"product form":"other","net quantity":4,"unit":"yards","price":28000,"price per unit":7000,"seller name":null,"seller type":"retailer","seller origin":null,"number of reviews":0,"average rating":0,"sales rank or badge":null,"certifications":[],"claims":[],"transparency origin":null,"cold pressed":false,"steam distilled":false,"refined":null,"list of ingredients":[],"image":"https://ng.jumia.is/unsafe/fit-in/300x300/filters:fill(white)/product/78/1246473/1.jpg?7905","product description":null,"return policy":null,"collection method":"other"}
+# Worked examples live in prompt_examples.json, keyed by platform; only the one
+# matching the record's platform is sent, rather than all of them on every call
+_EXAMPLES_PATH = Path(__file__).with_name("prompt_examples.json")
+_EXAMPLES_PLACEHOLDER = "<<<EXAMPLES>>>"
+_PROMPT_PLACEHOLDER = "<<<INPUT_PRODUCT_JSON>>>"
+_EXAMPLE_HEADING = (
+    "EXAMPLE (the required output format — replicate this style exactly):\n"
+)
+# used when the record's platform has no example of its own
+DEFAULT_EXAMPLE_PLATFORM = "amazon"
 
-5) Walmart sample input -> example output
-{"platform":"Walmart","date":null,"product ID":"49586260","name":"Organic Shea Butter by Now Foods - 7 Ounces","scientific name":"Butyrospermum parkii","product form":"butter","net quantity":7,"unit":"oz","price":12.99,"price per unit":1.8557142857142858,"seller name":"The Fruitful Yield, Inc.","seller type":"retailer","seller origin":"United States","number of reviews":21,"average rating":4.3,"sales rank or badge":null,"certifications":["USDA Organic"],"claims":["100% pure","moisturizing","emollient","vitamin enriched"],"transparency origin":"Derived from karite trees in Western and Central Africa","cold pressed":false,"steam distilled":false,"refined":null,"list of ingredients":["Organic Butyrospermum Parkii (Shea) Butter"],"image":"[https://i5.walmartimages.com/seo/NOW-Foods-Organic-Shea-Butter-7-fl-oz-Solid-Oil_1fa1cc86-cc96-42eb-9558-a33582704a94.02be8fd38738688752e1582f5e2e1657.jpeg","product](https://i5.walmartimages.com/seo/NOW-Foods-Organic-Shea-Butter-7-fl-oz-Solid-Oil_1fa1cc86-cc96-42eb-9558-a33582704a94.02be8fd38738688752e1582f5e2e1657.jpeg%22,%22product) description":"Condition: Dry, cracked or chapped skin in need of moisture, especially on tougher areas such as the elbows, knees and feet. Solution: 100% Pure & Certified Organic Shea Butter has a rich, luxurious texture that penetrates deep to condition and moisturize every type of skin. Shea Butter is derived from the tree nuts of the karite trees that grow in Western and Central Africa. It is a wonderful emollient that's perfect for daily use. Can also be used as a scalp moisturizer.","return policy":"Free 90-day returns","collection method":"other"}
 
-6) Amazon sample input -> example output
-{"platform":"Amazon","date":null,"product ID":"B0CF6SKMH1","name":"Kyabo 100% Pure and All Natural Cocoa Butter - 3lb - Food Grade - great for making lip balm, cream, hair products, candle, hair removal and craft projects - Made with Organic Cacao","scientific name":"Theobroma cacao","product form":"butter","net quantity":3,"unit":"lb","price":77.95,"price per unit":25.983333333333334,"seller name":"kyabo Organics","seller type":"manufacturer","seller origin":"United States","number of reviews":105,"average rating":4.6,"sales rank or badge":"#78,241 in Beauty & Personal Care; #246 in Body Butters","certifications":["organic"],"claims":["100% pure","vegan","keto-friendly","ethically sourced","food grade"],"transparency origin":null,"cold pressed":false,"steam distilled":false,"refined":null,"list of ingredients":["Cocoa Butter"],"image":"[https://m.media-amazon.com/images/I/41VMno9CISL._SY300_SX300_QL70_FMwebp_.jpg","product](https://m.media-amazon.com/images/I/41VMno9CISL._SY300_SX300_QL70_FMwebp_.jpg%22,%22product) description":"Cocoa Butter is a easily absorbed Body Butter leaving your skin smooth and soft for up to 48hrs after application! Body Moisturizer that will soften skin. For dry / very dry skin 48hr Hydration - Easily absorbed Rich in Vitamin E, Prevents & Treats Stretch Marks. Soft, smooth and easy to directly to skin apply. Great addition to your recipe for making lotion, cream, lip balm etc. Shelf Life: This butter should be stored in a cool, dark place and has a shelf-life of 2 years when stored properly.","return policy":null,"collection method":"other"}
+def _split_template(template: str, *placeholders: str) -> Tuple[str, ...]:
+    """Split `template` at each placeholder, which must occur exactly once."""
+    for placeholder in placeholders:
+        if template.count(placeholder) != 1:
+            raise ValueError(f"prompt template must contain {placeholder} once")
+    parts = []
+    for placeholder in placeholders:
+        head, template = template.split(placeholder, 1)
+        parts.append(head)
+    parts.append(template)
+    return tuple(parts)
 
-Return the normalized JSON now.
 
-END OF PROMPT
-"""
+# Split once at import so filling in a product is a concatenation rather than a
+# scan of the whole template per call. The payload is only ever joined between
+# the pieces, never searched, so placeholder-like text inside a product can't
+# be substituted by mistake.
+_PROMPT_HEAD, _PROMPT_CONTEXT, PROMPT_SUFFIX = _split_template(
+    PROMPT_INSTRUCTION, _EXAMPLES_PLACEHOLDER, _PROMPT_PLACEHOLDER
+)
+
+
+# Chat calls send the instructions, which are the same for every record, as the
+# system message and the rest (example, payload, suffix) as the user message,
+# so the system content is byte-identical across calls and providers can serve
+# it from their prompt cache.
+SYSTEM_ROLE = "You are a helpful, precise data formatter."
+SYSTEM_PROMPT = f"{SYSTEM_ROLE}\n{_PROMPT_HEAD}"
+
+
+def _replace_once(text: str, old: str, new: str) -> str:
+    if text.count(old) != 1:
+        raise ValueError(f"prompt template must contain {old[:40]!r}... once")
+    return text.replace(old, new)
+
+
+# Several products in one call (see render_batch_prompt) need their own
+# instructions: the task sentence and the output shape describe an
+# {id: normalized object} envelope instead of a single object.
+_GROUP_HEAD = _replace_once(
+    _replace_once(
+        _PROMPT_HEAD,
+        "You will convert ONE scraped product JSON (given below) into exactly ONE "
+        "JSON object whose keys match the CSV header below **exactly** (including "
+        "spaces and punctuation).  \nReturn **only** the JSON object",
+        "You will convert SEVERAL scraped product JSONs (given below as one JSON "
+        "object mapping an id to each product) into ONE JSON object that maps "
+        "every one of those ids to that product's normalized JSON object, whose "
+        "keys match the CSV header below **exactly** (including spaces and "
+        "punctuation).\nReturn **only** that JSON object",
+    ),
+    "- One JSON object with exactly the header keys above (same strings, "
+    "including spaces) and no others.",
+    "- One JSON object whose keys are exactly the input ids (all of them, no "
+    "others); each value is one product's JSON object with exactly the header "
+    "keys above (same strings, including spaces) and no others. The bullets and "
+    "rules below apply within each product object.",
+)
+GROUP_SYSTEM_PROMPT = f"{SYSTEM_ROLE}\n{_GROUP_HEAD}"
+
+
+def split_prompt(prompt: str) -> Tuple[str, str]:
+    """Return the (system, user) message contents for a rendered prompt.
+
+    A prompt not built from the template goes wholly in the user message.
+    """
+    if prompt.startswith(_PROMPT_HEAD):
+        return SYSTEM_PROMPT, prompt[len(_PROMPT_HEAD) :]
+    if prompt.startswith(_GROUP_HEAD):
+        return GROUP_SYSTEM_PROMPT, prompt[len(_GROUP_HEAD) :]
+    return SYSTEM_ROLE, prompt
+
+
+@lru_cache(maxsize=1)
+def _example_bank() -> Dict[str, str]:
+    """Load the worked examples (on first use) as rendered text keyed by platform."""
+    bank = orjson.loads(_EXAMPLES_PATH.read_bytes())
+    rendered = {}
+    for platform, example in bank.items():
+        lines = [example["title"]]
+        if example.get("input"):
+            lines.append(f"Input (summarized context): {example['input']}")
+            lines.append("Expected normalized JSON output:")
+        lines.append(orjson.dumps(example["output"]).decode("utf-8"))
+        rendered[platform] = _EXAMPLE_HEADING + "\n".join(lines)
+    return rendered
+
+
+# The "platform" column is filled from the record's domain, not by the model
+PLATFORM_BY_DOMAIN = {
+    "amazon": "Amazon",
+    "ebay": "Ebay",
+    "etsy": "Etsy",
+    "jumia": "Jumia",
+    "walmart": "Walmart",
+    "alibaba": "Alibaba",
+}
+_PLATFORM_RE = re.compile(
+    r"\b(" + "|".join(PLATFORM_BY_DOMAIN) + r")(?:\.|$)", re.IGNORECASE
+)
+
+
+def _platform_key(source: Optional[str]) -> Optional[str]:
+    # source is a domain ("www.ebay.com") or a bare site name ("ebay")
+    m = _PLATFORM_RE.search(source) if source else None
+    return m.group(1).lower() if m else None
+
+
+def platform_name(source: Optional[str]) -> Optional[str]:
+    """Return the "platform" value for a record's source, or None if unknown."""
+    key = _platform_key(source)
+    return PLATFORM_BY_DOMAIN[key] if key else None
+
+
+def example_platform(source: Optional[str]) -> str:
+    """Return the example bank key for a record's source."""
+    key = _platform_key(source)
+    return key if key in _example_bank() else DEFAULT_EXAMPLE_PLATFORM
+
+
+def _example(platform: str) -> str:
+    bank = _example_bank()
+    return bank.get(platform) or bank[DEFAULT_EXAMPLE_PLATFORM]
+
+
+@lru_cache(maxsize=None)
+def prompt_prefix(platform: str) -> str:
+    """Everything before the product JSON, with `platform`'s example filled in."""
+    return "".join((_PROMPT_HEAD, _example(platform), _PROMPT_CONTEXT))
+
+
+def render_prompt(payload_json: str, platform: str = DEFAULT_EXAMPLE_PLATFORM) -> str:
+    """Return the prompt with `platform`'s example and `payload_json` filled in."""
+    return "".join((prompt_prefix(platform), payload_json, PROMPT_SUFFIX))
+
+
+# Several products in one call: the payload is a JSON object mapping an id to
+# each product, and the reply must map the same ids to normalized objects
+_BATCH_NOTE = (
+    "This request holds several products, not one: the JSON below maps ids to "
+    "products, each shaped as described above. Return ONE JSON object mapping "
+    "every id to that product's normalized JSON object (the format above), "
+    "with no other keys.\n\n"
+)
+
+
+@lru_cache(maxsize=None)
+def _batch_prompt_prefix(platform: str) -> str:
+    return "".join((_GROUP_HEAD, _example(platform), _PROMPT_CONTEXT, _BATCH_NOTE))
+
+
+def render_batch_prompt(
+    products_json: str, platform: str = DEFAULT_EXAMPLE_PLATFORM
+) -> str:
+    """Return the prompt for an {id: product} object, with `platform`'s example."""
+    return "".join((_batch_prompt_prefix(platform), products_json, PROMPT_SUFFIX))
+
+
+# The same pieces pre-encoded, for callers that already hold the payload as
+# UTF-8 bytes (e.g. straight from orjson.dumps)
+PROMPT_SUFFIX_BYTES = PROMPT_SUFFIX.encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def _prompt_prefix_bytes(platform: str) -> bytes:
+    return prompt_prefix(platform).encode("utf-8")
+
+
+def render_prompt_bytes(
+    payload_json: bytes, platform: str = DEFAULT_EXAMPLE_PLATFORM
+) -> bytes:
+    """Return the UTF-8 encoded prompt with `payload_json` filled in."""
+    return b"".join((_prompt_prefix_bytes(platform), payload_json, PROMPT_SUFFIX_BYTES))
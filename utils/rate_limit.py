@@ -0,0 +1,85 @@
+"""
+utils/rate_limit.py
+
+Token-bucket rate limiting for Apify API calls (also used to pace Azure OpenAI
+requests in utils/normalize.py).
+
+Example:
+    from utils.rate_limit import get_bucket
+    await get_bucket("etsy").acquire_async()  # before each Apify API request
+
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Token bucket refilled from a monotonic clock.
+
+    `rate` tokens are added per second up to `capacity` (defaults to `rate`, i.e.
+    at most one second's worth of burst). Safe to share between threads.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be > 0")
+        self._base_rate = float(rate)
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._throttled_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """Take `tokens` (possibly going negative) and return seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if self._throttled_until and now >= self._throttled_until:
+                self.rate = self._base_rate
+                self._throttled_until = 0.0
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= tokens
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until `tokens` are available."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        """Wait (without blocking the event loop) until `tokens` are available."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def throttle(self, factor: float = 0.5, duration: float = 60.0) -> None:
+        """Scale the refill rate by `factor` for the next `duration` seconds."""
+        with self._lock:
+            self.rate = max(self.rate * factor, 1e-3)
+            self._throttled_until = time.monotonic() + duration
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(key: str) -> TokenBucket:
+    """Return the shared bucket for `key` (e.g. an actor key), created on first use."""
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            from config.settings import settings
+
+            bucket = _buckets[key] = TokenBucket(settings.APIFY_RATE_LIMIT_RPS)
+        return bucket
+
@@ -0,0 +1,56 @@
+"""
+utils/url_normalize.py
+
+Canonical form for start/search URLs so equivalent spellings dedupe to one entry.
+
+Example:
+    from utils.url_normalize import canonicalize
+    canonicalize("HTTPS://www.Etsy.com:443/c/index.html?")  # "https://www.etsy.com/c/"
+
+"""
+
+from __future__ import annotations
+
+import re
+import string
+from urllib.parse import urlsplit, urlunsplit
+
+_DEFAULT_PORTS = {"http": ":80", "https": ":443"}
+
+# RFC 3986 unreserved characters; percent-encoding them is equivalent to the literal
+_UNRESERVED = frozenset(string.ascii_letters + string.digits + "-._~")
+_PCT_RE = re.compile(r"%([0-9A-Fa-f]{2})")
+
+
+def _normalize_escape(m: "re.Match[str]") -> str:
+    ch = chr(int(m.group(1), 16))
+    return ch if ch in _UNRESERVED else "%" + m.group(1).upper()
+
+
+def canonicalize(url: str) -> str:
+    """Return a canonical spelling of an http(s) URL.
+
+    Lowercases scheme and host, drops the default port, an empty `?` query and a
+    trailing `index.html`, and decodes percent-escaped unreserved characters
+    (other escapes get uppercase hex). Unparseable input is returned unchanged.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+
+    userinfo, sep, hostport = parts.netloc.rpartition("@")
+    hostport = hostport.lower()
+    default_port = _DEFAULT_PORTS.get(scheme)
+    if default_port and hostport.endswith(default_port):
+        hostport = hostport[: -len(default_port)]
+    netloc = f"{userinfo}{sep}{hostport}"
+
+    path = parts.path or "/"
+    if path.endswith("/index.html"):
+        path = path[: -len("index.html")]
+    path = _PCT_RE.sub(_normalize_escape, path)
+    query = _PCT_RE.sub(_normalize_escape, parts.query)
+
+    return urlunsplit((scheme, netloc, path, query, parts.fragment))